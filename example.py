@@ -8,7 +8,9 @@ portfolio data and generate reports.
 
 import sys
 import os
-from typing import Dict, Any
+from collections import ChainMap
+
+import numpy as np
 
 # Add the src directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -22,13 +24,30 @@ from visualization import ChartGenerator
 # Setup logging
 logger = setup_logging(__name__)
 
+# Output templates, filled with format_map and written in one call each
+PORTFOLIO_TEMPLATE = """
+Portfolio Analysis Results:
+Total Value: ₹{total_value:,.2f}
+Total P&L: ₹{total_pnl:,.2f}
+Number of Holdings: {number_of_holdings}
+P&L Percentage: {total_pnl_percentage:.2f}%
+
+Sector Analysis:
+{sector_lines}
+Top Holdings:
+{top_holding_lines}"""
+
+RISK_TEMPLATE = """Risk Score: {risk_score:.2f}/10
+Diversification Score: {diversification_score:.2f}/10
+Portfolio Volatility: {portfolio_volatility:.2%}
+95% VaR: {var_95:.2%}
+"""
+
+DIVERSIFICATION_TEMPLATE = """Herfindahl-Hirschman Index: {herfindahl_hirschman_index:.3f}
+Effective Number of Stocks: {effective_number_of_stocks:.1f}
 
-def _calculate_market_value(holding: Dict[str, Any]) -> float:
-    """Calculate market value from quantity and close_price."""
-    if 'market_value' in holding:
-        return float(holding['market_value'])
-    else:
-        return float(holding['quantity']) * float(holding['close_price'])
+Diversification Recommendations:
+{recommendation_lines}"""
 
 
 def main():
@@ -52,51 +71,51 @@ def main():
         
         # Analyze portfolio
         print("Analyzing portfolio...")
-        portfolio_analysis = portfolio_analyzer.analyze_portfolio(sample_portfolio)
-        
-        print(f"\nPortfolio Analysis Results:")
-        print(f"Total Value: ₹{portfolio_analysis['total_value']:,.2f}")
-        print(f"Total P&L: ₹{portfolio_analysis['total_pnl']:,.2f}")
-        print(f"Number of Holdings: {portfolio_analysis['number_of_holdings']}")
-        print(f"P&L Percentage: {portfolio_analysis['total_pnl_percentage']:.2f}%")
-        
-        # Show sector analysis
-        print(f"\nSector Analysis:")
-        for sector, data in portfolio_analysis['sector_analysis'].items():
-            print(f"  {sector}: {data['percentage']:.1f}% (₹{data['total_value']:,.2f})")
-        
-        # Show top holdings
-        print(f"\nTop Holdings:")
-        for i, holding in enumerate(portfolio_analysis['top_holdings'][:5], 1):
-            print(f"  {i}. {holding['tradingsymbol']}: ₹{_calculate_market_value(holding):,.2f}")
+        portfolio_analysis = portfolio_analyzer.analyze_portfolio(sample_portfolio, top_n=5)
+        
+        # Sector analysis and top holdings
+        sector_lines = "".join(
+            f"  {sector}: {data['percentage']:.1f}% (₹{data['total_value']:,.2f})\n"
+            for sector, data in portfolio_analysis['sector_analysis'].items()
+        )
+        top_holdings = portfolio_analysis['top_holdings']
+        # analyze_portfolio fills in market_value; cast the column in one shot
+        market_values = np.asarray([h['market_value'] for h in top_holdings], dtype=np.float64)
+        top_holding_lines = "".join(
+            f"  {i}. {holding['tradingsymbol']}: ₹{market_values[i - 1]:,.2f}\n"
+            for i, holding in enumerate(top_holdings, 1)
+        )
+        
+        sys.stdout.write(PORTFOLIO_TEMPLATE.format_map(ChainMap(
+            {'sector_lines': sector_lines, 'top_holding_lines': top_holding_lines},
+            portfolio_analysis
+        )))
         
         # Risk analysis
         print(f"\nPerforming risk analysis...")
         risk_analysis = risk_analyzer.analyze_portfolio_risk(sample_portfolio)
         
         if 'error' not in risk_analysis:
-            print(f"Risk Score: {risk_analysis['risk_score']:.2f}/10")
-            print(f"Diversification Score: {risk_analysis['diversification_score']:.2f}/10")
-            print(f"Portfolio Volatility: {risk_analysis['portfolio_volatility']:.2%}")
-            print(f"95% VaR: {risk_analysis['var_95']:.2%}")
+            sys.stdout.write(RISK_TEMPLATE.format_map(risk_analysis))
         
         # Diversification analysis
         print(f"\nPerforming diversification analysis...")
         diversification = risk_analyzer.analyze_diversification(sample_portfolio['holdings'])
         
         if 'error' not in diversification:
-            print(f"Herfindahl-Hirschman Index: {diversification['herfindahl_hirschman_index']:.3f}")
-            print(f"Effective Number of Stocks: {diversification['effective_number_of_stocks']:.1f}")
-            
-            print(f"\nDiversification Recommendations:")
-            for rec in diversification['diversification_recommendations']:
-                print(f"  - {rec}")
+            recommendation_lines = "".join(
+                f"  - {rec}\n" for rec in diversification['diversification_recommendations']
+            )
+            sys.stdout.write(DIVERSIFICATION_TEMPLATE.format_map(ChainMap(
+                {'recommendation_lines': recommendation_lines}, diversification
+            )))
         
         # Generate charts
         print(f"\nGenerating charts...")
         chart_path = chart_generator.create_portfolio_summary_chart(sample_portfolio)
         if chart_path:
             print(f"Portfolio chart saved to: {chart_path}")
+        chart_generator.close()
         
         # Generate reports
         print(f"\nGenerating reports...")
@@ -38,6 +38,10 @@ setup(
             "flake8>=5.0.0",
             "mypy>=0.991",
         ],
+        "fast": [
+            "numba>=0.56.0",
+            "pyarrow>=10.0.0",
+        ],
     },
     entry_points={
         "console_scripts": [
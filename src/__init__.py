@@ -5,15 +5,21 @@ This package provides tools for portfolio analysis, performance tracking, risk a
 and visualization of Zerodha trading data.
 """
 
+import importlib
+
 __version__ = "0.1.0"
 __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
-from .portfolio import PortfolioAnalyzer
-from .performance import PerformanceAnalyzer
-from .risk import RiskAnalyzer
-from .data import DataManager
-from .visualization import ChartGenerator
+# Public classes are imported on first access (PEP 562) so that importing the
+# package does not pull in pandas, matplotlib, scipy, etc. up front.
+_LAZY_IMPORTS = {
+    "PortfolioAnalyzer": ".portfolio",
+    "PerformanceAnalyzer": ".performance",
+    "RiskAnalyzer": ".risk",
+    "DataManager": ".data",
+    "ChartGenerator": ".visualization",
+}
 
 __all__ = [
     "PortfolioAnalyzer",
@@ -21,4 +27,17 @@ __all__ = [
     "RiskAnalyzer",
     "DataManager",
     "ChartGenerator",
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
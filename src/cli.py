@@ -6,29 +6,90 @@ allowing users to interact with the portfolio analysis tools.
 """
 
 import argparse
+import functools
 import sys
 import os
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from datetime import datetime
-import pandas as pd
+from pathlib import Path
 
-from .portfolio import PortfolioAnalyzer
-from .performance import PerformanceAnalyzer
-from .risk import RiskAnalyzer
-from .visualization import ChartGenerator
+# pandas and the analyzer modules are imported inside the handlers that need
+# them, so commands like `setup` and `data` don't pay for loading them
 from .utils import load_config, setup_logging, create_sample_data
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from .portfolio import PortfolioAnalyzer
+    from .risk import RiskAnalyzer
 
-def _calculate_market_value(holding: Dict[str, Any]) -> float:
-    """Calculate market value from quantity and close_price."""
-    if 'market_value' in holding:
-        return float(holding['market_value'])
-    else:
-        return float(holding['quantity']) * float(holding['close_price'])
 
+def _holdings_to_df(portfolio: Dict[str, Any]) -> 'pd.DataFrame':
+    """
+    Normalize portfolio holdings into a DataFrame once.
+    
+    Numeric columns are parsed in a single vectorized pass so downstream
+    reports can read them without per-row float() conversions.
+    """
+    import pandas as pd
+    
+    df = pd.DataFrame.from_records(portfolio['holdings'])
+    if df.empty:
+        return pd.DataFrame(columns=['quantity', 'market_value', 'pnl'], dtype='float64')
+    
+    df['quantity'] = pd.to_numeric(df['quantity'])
+    if 'market_value' not in df:
+        df['market_value'] = df['quantity'] * pd.to_numeric(df['close_price'])
+    return df.astype({'market_value': 'float64', 'pnl': 'float64'})
 
-def main():
-    """Main CLI entry point."""
+
+@functools.lru_cache(maxsize=4)
+def _cached_portfolio(portfolio_analyzer: 'PortfolioAnalyzer') -> Dict[str, Any]:
+    """Fetch the current portfolio once per analyzer for this invocation."""
+    return portfolio_analyzer.get_portfolio()
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_risk(risk_analyzer: 'RiskAnalyzer', portfolio_analyzer: 'PortfolioAnalyzer') -> Dict[str, Any]:
+    """Analyze the cached portfolio's risk once per analyzer pair."""
+    return risk_analyzer.analyze_portfolio_risk(_cached_portfolio(portfolio_analyzer))
+
+
+_parser: Optional[argparse.ArgumentParser] = None
+_portfolio_analyzer: Optional['PortfolioAnalyzer'] = None
+_risk_analyzer: Optional['RiskAnalyzer'] = None
+
+
+def _get_portfolio_analyzer(config: Dict[str, Any]) -> 'PortfolioAnalyzer':
+    """
+    Return the process-wide PortfolioAnalyzer, creating it on first use.
+    
+    Sharing one instance lets every handler reuse its Kite session and its
+    cached historical portfolio queries.
+    """
+    global _portfolio_analyzer
+    if _portfolio_analyzer is None:
+        from .portfolio import PortfolioAnalyzer
+        _portfolio_analyzer = PortfolioAnalyzer(config)
+    return _portfolio_analyzer
+
+
+def _get_risk_analyzer(config: Dict[str, Any]) -> 'RiskAnalyzer':
+    """
+    Return the process-wide RiskAnalyzer, creating it on first use.
+    
+    _cached_risk is keyed on the analyzer, so handlers must share this one
+    instance for its results to be reused.
+    """
+    global _risk_analyzer
+    if _risk_analyzer is None:
+        from .risk import RiskAnalyzer
+        _risk_analyzer = RiskAnalyzer(config)
+    return _risk_analyzer
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands."""
     parser = argparse.ArgumentParser(
         description="Zerodhawise - Portfolio Analysis Tool",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -97,6 +158,20 @@ Examples:
     data_parser.add_argument('--stats', action='store_true', help='Show database statistics')
     data_parser.add_argument('--config', type=str, help='Path to config file')
     
+    return parser
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    """Return the process-wide argument parser, building it on first use."""
+    global _parser
+    if _parser is None:
+        _parser = _build_parser()
+    return _parser
+
+
+def main():
+    """Main CLI entry point."""
+    parser = _get_parser()
     args = parser.parse_args()
     
     if not args.command:
@@ -127,51 +202,70 @@ Examples:
             sys.exit(1)
             
     except Exception as e:
-        logger.error(f"Error executing command: {str(e)}")
+        logger.error("Error executing command: %s", e)
         print(f"Error: {str(e)}")
         sys.exit(1)
 
 
 def handle_portfolio_command(args, config):
     """Handle portfolio command."""
-    analyzer = PortfolioAnalyzer(config)
+    if not any([args.summary, args.details, args.export]):
+        print("Please specify an action: --summary, --details, or --export")
+        return
+    
+    analyzer = _get_portfolio_analyzer(config)
     
     if args.summary:
         print("Fetching portfolio summary...")
-        summary = analyzer.get_portfolio_summary()
+        summary = analyzer.get_portfolio_summary(_cached_portfolio(analyzer))
         print(summary)
     
     elif args.details:
         print("Fetching portfolio details...")
-        portfolio = analyzer.get_portfolio()
-        analysis = analyzer.analyze_portfolio(portfolio)
+        portfolio = _cached_portfolio(analyzer)
+        holdings = portfolio['holdings']
+        analysis = analyzer.analyze_portfolio(portfolio, precomputed=analyzer.value_arrays(holdings))
         
-        print(f"\nPortfolio Analysis:")
-        print(f"Total Value: ₹{analysis['total_value']:,.2f}")
-        print(f"Total P&L: ₹{analysis['total_pnl']:,.2f}")
-        print(f"Number of Holdings: {analysis['number_of_holdings']}")
+        # Collect the output and write it in one go rather than one print per line
+        lines = [
+            "\nPortfolio Analysis:\n",
+            f"Total Value: ₹{analysis['total_value']:,.2f}\n",
+            f"Total P&L: ₹{analysis['total_pnl']:,.2f}\n",
+            f"Number of Holdings: {analysis['number_of_holdings']}\n",
+            "\nDetailed Holdings:\n",
+        ]
         
-        print(f"\nDetailed Holdings:")
-        for i, holding in enumerate(portfolio['holdings'], 1):
-            print(f"{i}. {holding['tradingsymbol']} ({holding['exchange']})")
-            print(f"   Quantity: {holding['quantity']}")
-            print(f"   Market Value: ₹{_calculate_market_value(holding):,.2f}")
-            print(f"   P&L: ₹{float(holding['pnl']):,.2f}")
-            print()
+        if holdings:
+            # Cast numeric columns once instead of calling float() per row
+            df = _holdings_to_df(portfolio)
+            df.index = range(1, len(df) + 1)
+            
+            columns = ['tradingsymbol', 'exchange', 'quantity', 'market_value', 'pnl']
+            lines.append(df[columns].to_string(formatters={
+                'market_value': '₹{:,.2f}'.format,
+                'pnl': '₹{:,.2f}'.format,
+            }) + "\n")
+        else:
+            lines.append("No holdings found.\n")
+        
+        sys.stdout.writelines(lines)
     
     elif args.export:
         print("Exporting portfolio report...")
-        filepath = analyzer.export_portfolio_report(args.export)
+        filepath = analyzer.export_portfolio_report(args.export, portfolio=_cached_portfolio(analyzer))
         print(f"Portfolio report exported to: {filepath}")
-    
-    else:
-        print("Please specify an action: --summary, --details, or --export")
 
 
 def handle_performance_command(args, config):
     """Handle performance command."""
+    if not any([args.metrics, args.export]):
+        print("Please specify an action: --metrics or --export")
+        return
+    
+    from .performance import PerformanceAnalyzer
+    
     analyzer = PerformanceAnalyzer(config)
-    portfolio_analyzer = PortfolioAnalyzer(config)
+    portfolio_analyzer = _get_portfolio_analyzer(config)
     
     # Get historical portfolio data
     portfolio_data = portfolio_analyzer.get_historical_portfolio(args.days)
@@ -203,22 +297,23 @@ def handle_performance_command(args, config):
         print("Generating performance report...")
         filepath = analyzer.generate_performance_report(portfolio_data, args.export)
         print(f"Performance report exported to: {filepath}")
-    
-    else:
-        print("Please specify an action: --metrics or --export")
 
 
 def handle_risk_command(args, config):
     """Handle risk command."""
-    analyzer = RiskAnalyzer(config)
-    portfolio_analyzer = PortfolioAnalyzer(config)
+    if not any([args.analyze, args.diversification, args.export]):
+        print("Please specify an action: --analyze, --diversification, or --export")
+        return
+    
+    analyzer = _get_risk_analyzer(config)
+    portfolio_analyzer = _get_portfolio_analyzer(config)
     
     # Get portfolio data
-    portfolio = portfolio_analyzer.get_portfolio()
+    portfolio = _cached_portfolio(portfolio_analyzer)
     
     if args.analyze:
         print("Analyzing portfolio risk...")
-        risk_analysis = analyzer.analyze_portfolio_risk(portfolio)
+        risk_analysis = _cached_risk(analyzer, portfolio_analyzer)
         
         if 'error' not in risk_analysis:
             print(f"\nRisk Analysis:")
@@ -249,93 +344,114 @@ def handle_risk_command(args, config):
         print("Generating risk report...")
         filepath = analyzer.generate_risk_report(portfolio, args.export)
         print(f"Risk report exported to: {filepath}")
-    
-    else:
-        print("Please specify an action: --analyze, --diversification, or --export")
 
 
 def handle_charts_command(args, config):
     """Handle charts command."""
+    if not any([args.all, args.portfolio, args.performance, args.risk, args.interactive]):
+        print("Please specify which charts to generate: --all, --portfolio, --performance, --risk, or --interactive")
+        return
+    
+    from .visualization import ChartGenerator
+    
     generator = ChartGenerator(config)
-    portfolio_analyzer = PortfolioAnalyzer(config)
-    performance_analyzer = PerformanceAnalyzer(config)
-    risk_analyzer = RiskAnalyzer(config)
+    portfolio_analyzer = _get_portfolio_analyzer(config)
     
-    # Get data
-    portfolio = portfolio_analyzer.get_portfolio()
-    performance_data = portfolio_analyzer.get_historical_portfolio(30)
-    risk_data = risk_analyzer.analyze_portfolio_risk(portfolio)
+    # Data is fetched on first use, so single-chart runs skip what they don't need
+    def portfolio():
+        return _cached_portfolio(portfolio_analyzer)
+    
+    def performance_data():
+        return portfolio_analyzer.get_historical_portfolio(30)
+    
+    def risk_data():
+        return _cached_risk(_get_risk_analyzer(config), portfolio_analyzer)
     
     if args.all or args.portfolio:
         print("Generating portfolio summary chart...")
-        chart_path = generator.create_portfolio_summary_chart(portfolio)
+        chart_path = generator.create_portfolio_summary_chart(portfolio())
         print(f"Portfolio chart saved to: {chart_path}")
     
     if args.all or args.performance:
-        if not performance_data.empty:
+        if not performance_data().empty:
             print("Generating performance chart...")
-            chart_path = generator.create_performance_chart(performance_data)
+            chart_path = generator.create_performance_chart(performance_data())
             print(f"Performance chart saved to: {chart_path}")
         else:
             print("No performance data available for chart generation.")
     
     if args.all or args.risk:
         print("Generating risk analysis chart...")
-        chart_path = generator.create_risk_analysis_chart(risk_data)
+        chart_path = generator.create_risk_analysis_chart(risk_data())
         print(f"Risk chart saved to: {chart_path}")
     
     if args.all or args.interactive:
         print("Generating interactive dashboard...")
         dashboard_path = generator.create_interactive_dashboard(
-            portfolio, performance_data, risk_data
+            portfolio(), performance_data(), risk_data()
         )
         print(f"Interactive dashboard saved to: {dashboard_path}")
     
-    if not any([args.all, args.portfolio, args.performance, args.risk, args.interactive]):
-        print("Please specify which charts to generate: --all, --portfolio, --performance, --risk, or --interactive")
+    generator.close()
 
 
 def handle_report_command(args, config):
     """Handle report command."""
-    portfolio_analyzer = PortfolioAnalyzer(config)
+    if not any([args.comprehensive, args.portfolio, args.performance, args.risk]):
+        print("Please specify which reports to generate: --comprehensive, --portfolio, --performance, or --risk")
+        return
+    
+    from .performance import PerformanceAnalyzer
+    from .visualization import ChartGenerator
+    
+    portfolio_analyzer = _get_portfolio_analyzer(config)
     performance_analyzer = PerformanceAnalyzer(config)
-    risk_analyzer = RiskAnalyzer(config)
+    risk_analyzer = _get_risk_analyzer(config)
     chart_generator = ChartGenerator(config)
     
     # Get data
-    portfolio = portfolio_analyzer.get_portfolio()
+    portfolio = _cached_portfolio(portfolio_analyzer)
     performance_data = portfolio_analyzer.get_historical_portfolio(30)
-    risk_data = risk_analyzer.analyze_portfolio_risk(portfolio)
+    risk_data = _cached_risk(risk_analyzer, portfolio_analyzer)
+    holdings_df = _holdings_to_df(portfolio)
     
     output_dir = args.output or "reports"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    if args.comprehensive or args.portfolio:
-        print("Generating portfolio report...")
-        portfolio_report = portfolio_analyzer.export_portfolio_report()
-        print(f"Portfolio report: {portfolio_report}")
-    
-    if args.comprehensive or args.performance:
-        if not performance_data.empty:
-            print("Generating performance report...")
-            performance_report = performance_analyzer.generate_performance_report(performance_data)
-            print(f"Performance report: {performance_report}")
-        else:
-            print("No performance data available for report generation.")
-    
-    if args.comprehensive or args.risk:
-        print("Generating risk report...")
-        risk_report = risk_analyzer.generate_risk_report(portfolio)
-        print(f"Risk report: {risk_report}")
-    
-    if args.comprehensive:
-        print("Generating comprehensive charts...")
-        charts = chart_generator.generate_report_charts(portfolio, performance_data, risk_data)
-        for chart_type, chart_path in charts.items():
-            print(f"{chart_type} chart: {chart_path}")
+    if not Path(output_dir).exists():
+        os.makedirs(output_dir, exist_ok=True)
     
-    if not any([args.comprehensive, args.portfolio, args.performance, args.risk]):
-        print("Please specify which reports to generate: --comprehensive, --portfolio, --performance, or --risk")
+    # The text reports are independent and mostly I/O bound, so run them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = {}
+        
+        if args.comprehensive or args.portfolio:
+            print("Generating portfolio report...")
+            futures[executor.submit(
+                portfolio_analyzer.export_portfolio_report, portfolio=portfolio, holdings_df=holdings_df
+            )] = 'Portfolio'
+        
+        if args.comprehensive or args.performance:
+            if not performance_data.empty:
+                print("Generating performance report...")
+                futures[executor.submit(
+                    performance_analyzer.generate_performance_report, performance_data
+                )] = 'Performance'
+            else:
+                print("No performance data available for report generation.")
+        
+        if args.comprehensive or args.risk:
+            print("Generating risk report...")
+            futures[executor.submit(risk_analyzer.generate_risk_report, portfolio)] = 'Risk'
+        
+        # pyplot is not thread-safe, so charts are drawn here while the reports run
+        if args.comprehensive:
+            print("Generating comprehensive charts...")
+            charts = chart_generator.generate_report_charts(portfolio, performance_data, risk_data)
+            for chart_type, chart_path in charts.items():
+                print(f"{chart_type} chart: {chart_path}")
+            chart_generator.close()
+        
+        for future in as_completed(futures):
+            print(f"{futures[future]} report: {future.result()}")
 
 
 def handle_setup_command(args, config):
@@ -346,7 +462,9 @@ def handle_setup_command(args, config):
         # Create directories
         directories = ['logs', 'data', 'reports', 'config']
         for directory in directories:
-            os.makedirs(directory, exist_ok=True)
+            path = Path(directory)
+            if not path.exists():
+                path.mkdir(parents=True)
             print(f"Created directory: {directory}")
         
         # Create config file if it doesn't exist
@@ -364,9 +482,10 @@ def handle_setup_command(args, config):
         sample_data = create_sample_data()
         
         # Save sample data
-        import json
-        with open('data/sample_portfolio.json', 'w') as f:
-            json.dump(sample_data, f, indent=2)
+        import orjson
+        Path('data/sample_portfolio.json').write_bytes(
+            orjson.dumps(sample_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
         
         print("Sample data created: data/sample_portfolio.json")
         print("You can use this data for testing the application.")
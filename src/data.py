@@ -6,17 +6,27 @@ for portfolio and market data.
 """
 
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-import json
+import orjson
 import os
-from sqlalchemy import create_engine, text
+import sqlite3
+import zlib
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from utils import load_config, setup_logging
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; exports then use pandas' writer
+    pa = None
+    pa_csv = None
+
 Base = declarative_base()
 
 
@@ -28,6 +38,17 @@ class DataManager:
     store data in database, and process historical data.
     """
     
+    # Insert statements are built once and shared, so their compiled form stays cached
+    _INSERT_PORTFOLIO = text("""
+        INSERT INTO portfolio_snapshots (timestamp, data, total_value, total_pnl, num_holdings)
+        VALUES (:timestamp, :data, :total_value, :total_pnl, :num_holdings)
+    """)
+    
+    _INSERT_MARKET = text("""
+        INSERT INTO market_data (symbol, timestamp, data)
+        VALUES (:symbol, :timestamp, :data)
+    """)
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the DataManager.
@@ -36,6 +57,8 @@ class DataManager:
             config: Configuration dictionary.
         """
         self.config = config
+        # Resolve nested config lookups once; later methods read the attribute
+        self.db_url = config.get('database', {}).get('url', 'sqlite:///portfolio.db')
         self.logger = setup_logging(__name__)
         self.engine = None
         self.Session = None
@@ -44,18 +67,103 @@ class DataManager:
     def _setup_database(self):
         """Setup database connection."""
         try:
-            db_url = self.config.get('database', {}).get('url', 'sqlite:///portfolio.db')
-            self.engine = create_engine(db_url)
+            if self.db_url.startswith('sqlite') and not self._is_memory_sqlite():
+                # Keep a small pool of open connections instead of reopening the file
+                self.engine = create_engine(self.db_url, poolclass=QueuePool, pool_size=1, max_overflow=4)
+            else:
+                self.engine = create_engine(self.db_url)
+            
+            if self.engine.dialect.name == 'sqlite':
+                event.listen(self.engine, 'connect', self._set_sqlite_pragmas)
+            else:
+                event.listen(self.engine, 'before_cursor_execute', self._enable_fast_executemany)
+            
             self.Session = sessionmaker(bind=self.engine)
             
             # Create tables
             Base.metadata.create_all(self.engine)
+            self._create_indexes()
             self.logger.info("Database setup completed")
             
         except Exception as e:
             self.logger.error(f"Database setup failed: {str(e)}")
             raise
     
+    def _is_memory_sqlite(self) -> bool:
+        """Check whether the database URL points at an in-memory SQLite database."""
+        return self.db_url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in self.db_url
+    
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        """Switch SQLite connections to WAL with relaxed syncing and larger caches."""
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+    
+    @staticmethod
+    def _enable_fast_executemany(conn, cursor, statement, parameters, context, executemany):
+        """Let drivers that support it (e.g. pyodbc) send executemany batches in one round trip."""
+        if executemany and hasattr(cursor, 'fast_executemany'):
+            cursor.fast_executemany = True
+    
+    @staticmethod
+    def _sqlite_copy(source_path: str, target_path: str):
+        """Copy one SQLite database into another with the online backup API."""
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            with target:
+                source.backup(target, pages=1024)
+        finally:
+            target.close()
+            source.close()
+    
+    def _create_indexes(self):
+        """Create indexes backing the timestamp and symbol lookups, if the tables exist."""
+        inspector = inspect(self.engine)
+        statements = []
+        
+        if inspector.has_table('market_data'):
+            statements.append("CREATE INDEX IF NOT EXISTS ix_market_symbol_ts ON market_data (symbol, timestamp)")
+        
+        if inspector.has_table('portfolio_snapshots'):
+            statements.append("CREATE INDEX IF NOT EXISTS ix_portfolio_ts ON portfolio_snapshots (timestamp DESC)")
+            if self.engine.dialect.name == 'sqlite':
+                # Expression index so get_portfolio_details' DATE(timestamp) filter can use it
+                statements.append("CREATE INDEX IF NOT EXISTS ix_portfolio_date ON portfolio_snapshots (date(timestamp))")
+        
+        if statements:
+            with self.engine.begin() as conn:
+                for statement in statements:
+                    conn.execute(text(statement))
+    
+    def _encode_payload(self, payload: Any) -> Union[str, bytes]:
+        """
+        Serialize a payload for the data column.
+        
+        On SQLite the JSON is zlib-compressed and stored as a BLOB (SQLite
+        columns accept either type); other databases keep plain JSON text.
+        """
+        raw = orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+        if self.engine.dialect.name == 'sqlite':
+            return zlib.compress(raw, 3)
+        return raw.decode()
+    
+    @staticmethod
+    def _payload_bytes(stored: Union[str, bytes]) -> bytes:
+        """Return the raw JSON bytes of a stored payload, compressed or legacy text."""
+        if isinstance(stored, str):
+            return stored.encode()
+        return zlib.decompress(stored)
+    
+    def _decode_payload(self, stored: Union[str, bytes]) -> Any:
+        """Deserialize a payload written by _encode_payload (or older plain-text rows)."""
+        return orjson.loads(self._payload_bytes(stored))
+    
     def _calculate_market_value(self, holding: Dict[str, Any]) -> float:
         """Calculate market value from quantity and close_price."""
         if 'market_value' in holding:
@@ -63,6 +171,19 @@ class DataManager:
         else:
             return float(holding['quantity']) * float(holding['close_price'])
     
+    @staticmethod
+    def _snapshot_timestamp(portfolio_data: Dict[str, Any], default: datetime) -> datetime:
+        """Return a snapshot's own 'timestamp' (datetime or ISO string), else the default."""
+        timestamp = portfolio_data.get('timestamp')
+        if isinstance(timestamp, datetime):
+            return timestamp
+        if isinstance(timestamp, str):
+            try:
+                return datetime.fromisoformat(timestamp)
+            except ValueError:
+                pass
+        return default
+    
     def save_portfolio(self, portfolio_data: Dict[str, Any]) -> bool:
         """
         Save portfolio data to database.
@@ -73,36 +194,52 @@ class DataManager:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            session = self.Session()
-            
-            # Create portfolio record
-            portfolio_record = {
-                'timestamp': datetime.now(),
-                'data': json.dumps(portfolio_data),
-                'total_value': sum(self._calculate_market_value(h) for h in portfolio_data.get('holdings', [])),
-                'total_pnl': sum(float(h['pnl']) for h in portfolio_data.get('holdings', [])),
-                'num_holdings': len(portfolio_data.get('holdings', []))
-            }
+        return self.save_portfolios_bulk([portfolio_data])
+    
+    def save_portfolios_bulk(self, snapshots: List[Dict[str, Any]]) -> bool:
+        """
+        Save several portfolio snapshots in a single transaction.
+        
+        Each row is stamped with its snapshot's 'timestamp', or the current
+        time when the snapshot has none.
+        
+        Args:
+            snapshots: List of portfolio data dictionaries.
             
-            # Insert into database
-            query = text("""
-                INSERT INTO portfolio_snapshots (timestamp, data, total_value, total_pnl, num_holdings)
-                VALUES (:timestamp, :data, :total_value, :total_pnl, :num_holdings)
-            """)
+        Returns:
+            True if successful, False otherwise.
+        """
+        if not snapshots:
+            return True
+        
+        try:
+            now = datetime.now()
+            
+            # Create portfolio records
+            portfolio_records = []
+            for portfolio_data in snapshots:
+                holdings = portfolio_data.get('holdings', [])
+                market_values = np.fromiter(
+                    (self._calculate_market_value(h) for h in holdings), dtype=np.float64, count=len(holdings)
+                )
+                pnls = np.fromiter((h['pnl'] for h in holdings), dtype=np.float64, count=len(holdings))
+                portfolio_records.append({
+                    'timestamp': self._snapshot_timestamp(portfolio_data, now),
+                    'data': self._encode_payload(portfolio_data),
+                    'total_value': float(market_values.sum()),
+                    'total_pnl': float(pnls.sum()),
+                    'num_holdings': len(holdings)
+                })
             
-            session.execute(query, portfolio_record)
-            session.commit()
-            session.close()
+            # Insert into database; a list of parameter sets runs as one executemany
+            with self.engine.begin() as conn:
+                conn.execute(self._INSERT_PORTFOLIO, portfolio_records)
             
-            self.logger.info("Portfolio data saved successfully")
+            self.logger.info(f"Saved {len(portfolio_records)} portfolio snapshot(s) successfully")
             return True
             
         except Exception as e:
             self.logger.error(f"Error saving portfolio data: {str(e)}")
-            if session:
-                session.rollback()
-                session.close()
             return False
     
     def get_historical_portfolio(self, days: int = 30) -> pd.DataFrame:
@@ -116,8 +253,6 @@ class DataManager:
             DataFrame containing historical portfolio data.
         """
         try:
-            session = self.Session()
-            
             # Query historical data
             query = text("""
                 SELECT timestamp, total_value, total_pnl, num_holdings
@@ -127,23 +262,12 @@ class DataManager:
             """)
             
             start_date = datetime.now() - timedelta(days=days)
-            result = session.execute(query, {'start_date': start_date})
-            
-            # Convert to DataFrame
-            data = []
-            for row in result:
-                data.append({
-                    'timestamp': row.timestamp,
-                    'total_value': row.total_value,
-                    'total_pnl': row.total_pnl,
-                    'num_holdings': row.num_holdings
-                })
             
-            session.close()
+            # Fetch straight into columns instead of building a dict per row
+            df = pd.read_sql(query, self.engine, params={'start_date': start_date},
+                             index_col='timestamp', parse_dates=['timestamp'])
             
-            if data:
-                df = pd.DataFrame(data)
-                df.set_index('timestamp', inplace=True)
+            if not df.empty:
                 return df
             else:
                 return pd.DataFrame()
@@ -152,6 +276,49 @@ class DataManager:
             self.logger.error(f"Error fetching historical portfolio data: {str(e)}")
             return pd.DataFrame()
     
+    def iter_historical_portfolio(self, days: int = 30, chunk_days: int = 7) -> Iterator[pd.DataFrame]:
+        """
+        Yield historical portfolio data in consecutive time windows.
+        
+        Only one window is held in memory at a time, so callers can aggregate
+        long histories incrementally.
+        
+        Args:
+            days: Number of days to fetch.
+            chunk_days: Width of each window in days.
+            
+        Yields:
+            DataFrames shaped like get_historical_portfolio's, oldest window first;
+            empty windows are skipped.
+        """
+        query = text("""
+            SELECT timestamp, total_value, total_pnl, num_holdings
+            FROM portfolio_snapshots
+            WHERE timestamp >= :start_date AND timestamp < :end_date
+            ORDER BY timestamp
+        """)
+        
+        end_date = datetime.now()
+        window_start = end_date - timedelta(days=days)
+        step = timedelta(days=chunk_days)
+        
+        try:
+            while window_start < end_date:
+                window_end = window_start + step
+                # The last window is left open so snapshots saved meanwhile are included
+                params = {
+                    'start_date': window_start,
+                    'end_date': window_end if window_end < end_date else datetime.max
+                }
+                df = pd.read_sql(query, self.engine, params=params,
+                                 index_col='timestamp', parse_dates=['timestamp'])
+                if not df.empty:
+                    yield df
+                window_start = window_end
+                
+        except Exception as e:
+            self.logger.error(f"Error fetching historical portfolio data: {str(e)}")
+    
     def get_portfolio_details(self, date: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Get detailed portfolio data for a specific date.
@@ -187,7 +354,7 @@ class DataManager:
             session.close()
             
             if row:
-                return json.loads(row.data)
+                return self._decode_payload(row.data)
             else:
                 return {}
                 
@@ -206,31 +373,48 @@ class DataManager:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            session = self.Session()
+        return self.save_market_data_bulk([(symbol, data)])
+    
+    def save_market_data_bulk(self, records: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        Save market data for several symbols in a single transaction.
+        
+        Args:
+            records: List of (symbol, market data dictionary) pairs.
             
-            market_record = {
-                'symbol': symbol,
-                'timestamp': datetime.now(),
-                'data': json.dumps(data)
-            }
+        Returns:
+            True if successful, False otherwise.
+        """
+        if not records:
+            return True
+        
+        try:
+            timestamp = datetime.now()
             
-            query = text("""
-                INSERT INTO market_data (symbol, timestamp, data)
-                VALUES (:symbol, :timestamp, :data)
-            """)
+            market_records = [
+                {
+                    'symbol': symbol,
+                    'timestamp': timestamp,
+                    'data': self._encode_payload(data)
+                }
+                for symbol, data in records
+            ]
             
-            session.execute(query, market_record)
-            session.commit()
-            session.close()
+            with self.engine.begin() as conn:
+                conn.execute(self._INSERT_MARKET, market_records)
             
             return True
             
         except Exception as e:
             self.logger.error(f"Error saving market data: {str(e)}")
-            if session:
-                session.rollback()
-                session.close()
+            return False
+    
+    def has_market_data(self) -> bool:
+        """Whether the market_data table exists, so callers can skip per-symbol lookups."""
+        try:
+            return inspect(self.engine).has_table('market_data')
+        except Exception as e:
+            self.logger.error(f"Error inspecting market data table: {str(e)}")
             return False
     
     def get_market_data(self, symbol: str, days: int = 30) -> pd.DataFrame:
@@ -245,8 +429,6 @@ class DataManager:
             DataFrame containing market data.
         """
         try:
-            session = self.Session()
-            
             query = text("""
                 SELECT timestamp, data
                 FROM market_data
@@ -255,25 +437,21 @@ class DataManager:
             """)
             
             start_date = datetime.now() - timedelta(days=days)
-            result = session.execute(query, {
+            rows = pd.read_sql(query, self.engine, params={
                 'symbol': symbol,
                 'start_date': start_date
-            })
-            
-            data = []
-            for row in result:
-                market_data = json.loads(row.data)
-                market_data['timestamp'] = row.timestamp
-                data.append(market_data)
-            
-            session.close()
+            }, parse_dates=['timestamp'])
             
-            if data:
-                df = pd.DataFrame(data)
-                df.set_index('timestamp', inplace=True)
-                return df
-            else:
+            if rows.empty:
                 return pd.DataFrame()
+            
+            # Splice the payloads into one JSON array so they decode in a single call
+            records = orjson.loads(b'[' + b','.join(map(self._payload_bytes, rows['data'])) + b']')
+            df = pd.DataFrame.from_records(
+                records,
+                index=pd.Index(rows['timestamp'], name='timestamp')
+            )
+            return df.drop(columns='timestamp', errors='ignore')
                 
         except Exception as e:
             self.logger.error(f"Error fetching market data: {str(e)}")
@@ -283,6 +461,9 @@ class DataManager:
         """
         Export data to CSV file.
         
+        Uses pyarrow's streaming CSV writer when it is installed. A filename
+        ending in ``.parquet`` writes Parquet instead, for compact archives.
+        
         Args:
             data: DataFrame to export.
             filename: Output filename.
@@ -294,7 +475,15 @@ class DataManager:
             os.makedirs('data', exist_ok=True)
             filepath = os.path.join('data', filename)
             
-            data.to_csv(filepath)
+            if filename.endswith('.parquet'):
+                data.to_parquet(filepath)
+            elif pa is not None:
+                # Keep the index as the first column, where import_data_from_csv expects it
+                frame = data.reset_index(names=data.index.name or '')
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                pa_csv.write_csv(table, filepath, write_options=pa_csv.WriteOptions(batch_size=65536))
+            else:
+                data.to_csv(filepath, chunksize=65536)
             self.logger.info(f"Data exported to {filepath}")
             return filepath
             
@@ -319,7 +508,10 @@ class DataManager:
                 self.logger.error(f"File not found: {filepath}")
                 return pd.DataFrame()
             
-            df = pd.read_csv(filepath, index_col=0, parse_dates=True)
+            if filename.endswith('.parquet'):
+                df = pd.read_parquet(filepath)
+            else:
+                df = pd.read_csv(filepath, index_col=0, parse_dates=True)
             self.logger.info(f"Data imported from {filepath}")
             return df
             
@@ -380,34 +572,30 @@ class DataManager:
             Dictionary containing database statistics.
         """
         try:
-            session = self.Session()
-            
-            # Portfolio snapshots count
-            portfolio_query = text("SELECT COUNT(*) as count FROM portfolio_snapshots")
-            portfolio_result = session.execute(portfolio_query)
-            portfolio_count = portfolio_result.fetchone().count
-            
-            # Market data count
-            market_query = text("SELECT COUNT(*) as count FROM market_data")
-            market_result = session.execute(market_query)
-            market_count = market_result.fetchone().count
-            
-            # Date range
-            date_query = text("""
-                SELECT MIN(timestamp) as min_date, MAX(timestamp) as max_date
-                FROM portfolio_snapshots
+            # Counts and date range in a single round trip
+            stats_query = text("""
+                SELECT
+                    (SELECT COUNT(*) FROM portfolio_snapshots) AS portfolio_count,
+                    (SELECT COUNT(*) FROM market_data) AS market_count,
+                    (SELECT MIN(timestamp) FROM portfolio_snapshots) AS min_date,
+                    (SELECT MAX(timestamp) FROM portfolio_snapshots) AS max_date
             """)
-            date_result = session.execute(date_query)
-            date_row = date_result.fetchone()
             
-            session.close()
+            with self.engine.connect() as conn:
+                row = conn.execute(stats_query).fetchone()
+            
+            def to_iso(value):
+                # SQLite hands timestamps back as ISO strings already
+                if value is None or isinstance(value, str):
+                    return value
+                return value.isoformat()
             
             stats = {
-                'portfolio_snapshots': portfolio_count,
-                'market_data_records': market_count,
+                'portfolio_snapshots': row.portfolio_count,
+                'market_data_records': row.market_count,
                 'date_range': {
-                    'start': date_row.min_date.isoformat() if date_row.min_date else None,
-                    'end': date_row.max_date.isoformat() if date_row.max_date else None
+                    'start': to_iso(row.min_date),
+                    'end': to_iso(row.max_date)
                 }
             }
             
@@ -428,11 +616,10 @@ class DataManager:
             True if successful, False otherwise.
         """
         try:
-            # For SQLite, simply copy the database file
-            if 'sqlite' in self.config.get('database', {}).get('url', ''):
-                import shutil
-                db_path = self.config['database']['url'].replace('sqlite:///', '')
-                shutil.copy2(db_path, backup_path)
+            # For SQLite, copy page by page through SQLite itself so a live WAL database stays consistent
+            if 'sqlite' in self.db_url:
+                db_path = self.db_url.replace('sqlite:///', '')
+                self._sqlite_copy(db_path, backup_path)
                 self.logger.info(f"Database backed up to {backup_path}")
                 return True
             else:
@@ -454,11 +641,11 @@ class DataManager:
             True if successful, False otherwise.
         """
         try:
-            # For SQLite, simply copy the backup file
-            if 'sqlite' in self.config.get('database', {}).get('url', ''):
-                import shutil
-                db_path = self.config['database']['url'].replace('sqlite:///', '')
-                shutil.copy2(backup_path, db_path)
+            # For SQLite, copy the backup into the live database with the backup API
+            if 'sqlite' in self.db_url:
+                db_path = self.db_url.replace('sqlite:///', '')
+                self.engine.dispose()
+                self._sqlite_copy(backup_path, db_path)
                 self.logger.info(f"Database restored from {backup_path}")
                 return True
             else:
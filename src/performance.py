@@ -11,10 +11,108 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from scipy import stats
-from utils import load_config, setup_logging
+from utils import load_config, setup_logging, njit
 from data import DataManager
 
 
+@njit(cache=True)
+def _returns_metrics_kernel(values: np.ndarray):
+    """
+    Daily-return mean, sample std and max drawdown in a single pass.
+    
+    Returns (mean, std, max_drawdown, count) where count is the number of
+    returns used; NaN values are skipped.
+    """
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    prev = np.nan
+    peak = np.nan
+    max_dd = 0.0
+    for i in range(values.shape[0]):
+        value = values[i]
+        if value != value:
+            continue
+        if prev == prev:
+            # Welford update of the running mean and squared deviations
+            ret = value / prev - 1.0
+            count += 1
+            delta = ret - mean
+            mean += delta / count
+            m2 += delta * (ret - mean)
+        prev = value
+        if peak != peak or value > peak:
+            peak = value
+        drawdown = (value - peak) / peak
+        if drawdown < max_dd:
+            max_dd = drawdown
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+    return mean, std, max_dd, count
+
+
+@njit(cache=True)
+def _rolling_drawdown_kernel(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Drawdown from the trailing window maximum, in O(n) via a monotonic deque.
+    
+    Mirrors pandas rolling(window).max() with min_periods=window: positions
+    whose window holds fewer than ``window`` valid values are NaN.
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    deque_values = np.empty(n)
+    deque_index = np.empty(n, np.int64)
+    head = 0
+    tail = 0
+    valid = 0
+    for i in range(n):
+        value = values[i]
+        if value == value:
+            valid += 1
+            while tail > head and deque_values[tail - 1] <= value:
+                tail -= 1
+            deque_values[tail] = value
+            deque_index[tail] = i
+            tail += 1
+        if i >= window:
+            leaving = values[i - window]
+            if leaving == leaving:
+                valid -= 1
+        while tail > head and deque_index[head] <= i - window:
+            head += 1
+        if valid < window or value != value:
+            out[i] = np.nan
+        else:
+            peak = deque_values[head]
+            out[i] = (value - peak) / peak
+    return out
+
+
+@njit(cache=True)
+def _beta_kernel(portfolio: np.ndarray, market: np.ndarray) -> float:
+    """
+    Beta from a single Welford pass over aligned return arrays.
+    
+    Keeps the historical scaling of np.cov (ddof=1) over np.var (ddof=0).
+    """
+    n = portfolio.shape[0]
+    mean_p = 0.0
+    mean_m = 0.0
+    co_moment = 0.0
+    m2_market = 0.0
+    for i in range(n):
+        delta_p = portfolio[i] - mean_p
+        delta_m = market[i] - mean_m
+        mean_p += delta_p / (i + 1)
+        mean_m += delta_m / (i + 1)
+        co_moment += delta_p * (market[i] - mean_m)
+        m2_market += delta_m * (market[i] - mean_m)
+    market_variance = m2_market / n
+    if not market_variance > 0:
+        return 1.0
+    return (co_moment / (n - 1)) / market_variance
+
+
 class PerformanceAnalyzer:
     """
     Class for analyzing portfolio performance and calculating key metrics.
@@ -23,6 +121,44 @@ class PerformanceAnalyzer:
     including returns, risk measures, and performance attribution.
     """
     
+    # Report sections, parsed once at class creation and filled with format_map
+    _REPORT_HEADER_TEMPLATE = """
+ZerodhaWise Performance Report
+Generated: {generated}
+{rule}
+
+RETURN METRICS:
+{subrule}
+"""
+    
+    _RETURNS_TEMPLATE = """
+Total Return: {total_return:.2%}
+Annualized Return: {annualized_return:.2%}
+Average Daily Return: {avg_daily_return:.4%}
+30-Day Rolling Return: {rolling_30d_return:.2%}
+90-Day Rolling Return: {rolling_90d_return:.2%}
+Sharpe Ratio: {sharpe_ratio:.3f}
+Calmar Ratio: {calmar_ratio:.3f}
+Maximum Drawdown: {max_drawdown:.2%}
+"""
+    
+    _RISK_HEADER_TEMPLATE = """
+RISK METRICS:
+{subrule}
+"""
+    
+    _RISK_TEMPLATE = """
+Volatility (Annualized): {volatility:.2%}
+95% Value at Risk: {var_95:.2%}
+95% Conditional VaR: {cvar_95:.2%}
+Downside Deviation: {downside_deviation:.2%}
+Beta: {beta:.3f}
+Skewness: {skewness:.3f}
+Kurtosis: {kurtosis:.3f}
+99% Value at Risk: {var_99:.2%}
+99% Conditional VaR: {cvar_99:.2%}
+"""
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize the PerformanceAnalyzer.
@@ -47,42 +183,51 @@ class PerformanceAnalyzer:
         if len(portfolio_data) < 2:
             return {'error': 'Insufficient data for return calculation'}
         
-        # Calculate daily returns
-        portfolio_data['daily_return'] = portfolio_data['total_value'].pct_change()
+        # Pandas boundary: leave the DataFrame once, the rest is plain NumPy
+        values = np.ascontiguousarray(portfolio_data['total_value'].to_numpy(dtype=np.float64))
+        return self._returns_metrics(values)
+    
+    def _returns_metrics(self, values: np.ndarray) -> Dict[str, float]:
+        """
+        Numerical core of calculate_returns over a float64 array of portfolio values.
         
-        # Remove NaN values
-        returns = portfolio_data['daily_return'].dropna()
+        Mean, volatility and drawdown come out of one fused kernel pass; the
+        remaining metrics are scalar arithmetic on its results.
+        """
+        avg_daily_return, daily_std, max_drawdown, count = _returns_metrics_kernel(values)
         
-        if len(returns) == 0:
+        if count == 0:
             return {'error': 'No valid return data available'}
         
         # Calculate metrics
-        total_return = (portfolio_data['total_value'].iloc[-1] / portfolio_data['total_value'].iloc[0]) - 1
-        avg_daily_return = returns.mean()
-        annualized_return = (1 + avg_daily_return) ** 252 - 1
+        total_return = values[-1] / values[0] - 1.0
+        annualized_return = (1.0 + avg_daily_return) ** 252 - 1.0
         
         # Calculate rolling returns
-        rolling_30d = portfolio_data['total_value'].pct_change(30).iloc[-1]
-        rolling_90d = portfolio_data['total_value'].pct_change(90).iloc[-1]
+        rolling_30d = values[-1] / values[-31] - 1.0 if values.size > 30 else np.nan
+        rolling_90d = values[-1] / values[-91] - 1.0 if values.size > 90 else np.nan
         
         return {
-            'total_return': total_return,
-            'avg_daily_return': avg_daily_return,
-            'annualized_return': annualized_return,
-            'rolling_30d_return': rolling_30d,
-            'rolling_90d_return': rolling_90d,
-            'volatility': returns.std() * np.sqrt(252),  # Annualized volatility
-            'sharpe_ratio': self._calculate_sharpe_ratio(returns),
-            'max_drawdown': self._calculate_max_drawdown(portfolio_data['total_value']),
-            'calmar_ratio': self._calculate_calmar_ratio(annualized_return, portfolio_data['total_value'])
+            'total_return': float(total_return),
+            'avg_daily_return': float(avg_daily_return),
+            'annualized_return': float(annualized_return),
+            'rolling_30d_return': float(rolling_30d),
+            'rolling_90d_return': float(rolling_90d),
+            'volatility': float(daily_std * np.sqrt(252)),  # Annualized volatility
+            'sharpe_ratio': self._calculate_sharpe_ratio(avg_daily_return, daily_std),
+            'max_drawdown': float(max_drawdown),
+            'calmar_ratio': self._calculate_calmar_ratio(annualized_return, max_drawdown)
         }
     
-    def calculate_risk_metrics(self, portfolio_data: pd.DataFrame) -> Dict[str, float]:
+    def calculate_risk_metrics(self, portfolio_data: pd.DataFrame,
+                               returns: Optional[np.ndarray] = None) -> Dict[str, float]:
         """
         Calculate risk metrics for the portfolio.
         
         Args:
             portfolio_data: DataFrame containing portfolio value over time.
+            returns: Daily returns from _compute_returns_array, if the caller
+                already has them. Computed from portfolio_data otherwise.
             
         Returns:
             Dictionary containing risk metrics.
@@ -90,19 +235,21 @@ class PerformanceAnalyzer:
         if len(portfolio_data) < 2:
             return {'error': 'Insufficient data for risk calculation'}
         
-        returns = portfolio_data['total_value'].pct_change().dropna()
+        if returns is None:
+            returns = self._compute_returns_array(portfolio_data)
+        returns = returns[~np.isnan(returns)]
         
         if len(returns) == 0:
             return {'error': 'No valid return data available'}
         
         # Calculate risk metrics
-        volatility = returns.std() * np.sqrt(252)  # Annualized
-        var_95 = np.percentile(returns, 5)  # 95% VaR
-        cvar_95 = returns[returns <= var_95].mean()  # 95% CVaR
+        volatility = self._sample_std(returns) * np.sqrt(252)  # Annualized
+        var_95, cvar_95 = self._calculate_var_cvar(returns, 5)  # 95% VaR / CVaR
+        var_99, cvar_99 = self._calculate_var_cvar(returns, 1)  # 99% VaR / CVaR
         
         # Calculate downside deviation
         downside_returns = returns[returns < 0]
-        downside_deviation = downside_returns.std() * np.sqrt(252) if len(downside_returns) > 0 else 0
+        downside_deviation = self._sample_std(downside_returns) * np.sqrt(252) if len(downside_returns) > 0 else 0
         
         # Calculate beta (assuming market data available)
         beta = self._calculate_beta(returns)
@@ -115,8 +262,8 @@ class PerformanceAnalyzer:
             'beta': beta,
             'skewness': stats.skew(returns),
             'kurtosis': stats.kurtosis(returns),
-            'var_99': np.percentile(returns, 1),  # 99% VaR
-            'cvar_99': returns[returns <= np.percentile(returns, 1)].mean()
+            'var_99': var_99,
+            'cvar_99': cvar_99
         }
     
     def calculate_performance_attribution(self, portfolio_data: pd.DataFrame, 
@@ -134,32 +281,34 @@ class PerformanceAnalyzer:
         if len(portfolio_data) < 2:
             return {'error': 'Insufficient data for attribution analysis'}
         
-        portfolio_returns = portfolio_data['total_value'].pct_change().dropna()
+        # Compute the daily returns once and share them with the metric calculations
+        returns = self._compute_returns_array(portfolio_data)
         
         attribution = {
             'portfolio_metrics': self.calculate_returns(portfolio_data),
-            'risk_metrics': self.calculate_risk_metrics(portfolio_data)
+            'risk_metrics': self.calculate_risk_metrics(portfolio_data, returns=returns)
         }
         
         if benchmark_data is not None and len(benchmark_data) > 1:
+            portfolio_returns = pd.Series(returns, index=portfolio_data.index[1:]).dropna()
             benchmark_returns = benchmark_data['value'].pct_change().dropna()
             
             # Align returns
-            common_dates = portfolio_returns.index.intersection(benchmark_returns.index)
-            if len(common_dates) > 0:
-                portfolio_aligned = portfolio_returns.loc[common_dates]
-                benchmark_aligned = benchmark_returns.loc[common_dates]
-                
+            portfolio_aligned, benchmark_aligned = self._align_returns(portfolio_returns, benchmark_returns)
+            if len(portfolio_aligned) > 0:
                 # Calculate excess returns
                 excess_returns = portfolio_aligned - benchmark_aligned
+                excess_mean = excess_returns.mean()
+                tracking_std = self._sample_std(excess_returns)
                 
-                attribution['benchmark_comparison'] = {
-                    'excess_return': excess_returns.mean() * 252,
-                    'tracking_error': excess_returns.std() * np.sqrt(252),
-                    'information_ratio': (excess_returns.mean() / excess_returns.std()) * np.sqrt(252),
-                    'correlation': portfolio_aligned.corr(benchmark_aligned),
-                    'beta': self._calculate_beta(portfolio_aligned, benchmark_aligned)
-                }
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    attribution['benchmark_comparison'] = {
+                        'excess_return': excess_mean * 252,
+                        'tracking_error': tracking_std * np.sqrt(252),
+                        'information_ratio': (excess_mean / tracking_std) * np.sqrt(252),
+                        'correlation': self._correlation(portfolio_aligned, benchmark_aligned),
+                        'beta': self._beta_from_aligned(portfolio_aligned, benchmark_aligned)
+                    }
         
         return attribution
     
@@ -178,27 +327,36 @@ class PerformanceAnalyzer:
         if len(portfolio_data) < window:
             return pd.DataFrame()
         
-        returns = portfolio_data['total_value'].pct_change().dropna()
-        
-        rolling_metrics = pd.DataFrame(index=returns.index)
-        
-        # Rolling returns
-        rolling_metrics['rolling_return'] = returns.rolling(window).mean() * 252
-        
-        # Rolling volatility
-        rolling_metrics['rolling_volatility'] = returns.rolling(window).std() * np.sqrt(252)
-        
-        # Rolling Sharpe ratio
-        rolling_metrics['rolling_sharpe'] = (
-            rolling_metrics['rolling_return'] / rolling_metrics['rolling_volatility']
-        )
-        
-        # Rolling drawdown
-        rolling_metrics['rolling_drawdown'] = self._calculate_rolling_drawdown(
+        returns = self._compute_returns_array(portfolio_data)
+        valid = ~np.isnan(returns)
+        returns = returns[valid]
+        
+        # Rolling mean and volatility over strided window views, no per-column pandas machinery
+        rolling_mean = np.full(returns.size, np.nan)
+        rolling_std = np.full(returns.size, np.nan)
+        if returns.size >= window:
+            windows = np.lib.stride_tricks.sliding_window_view(returns, window)
+            rolling_mean[window - 1:] = windows.mean(axis=1)
+            if window > 1:
+                rolling_std[window - 1:] = windows.std(axis=1, ddof=1)
+        
+        rolling_return = rolling_mean * 252
+        rolling_volatility = rolling_std * np.sqrt(252)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rolling_sharpe = rolling_return / rolling_volatility
+        
+        # Rolling drawdown is computed on the values, then aligned with the returns
+        rolling_drawdown = self._calculate_rolling_drawdown(
             portfolio_data['total_value'], window
-        )
-        
-        return rolling_metrics
+        ).to_numpy()[1:][valid]
+        
+        # Assemble the result in one go
+        return pd.DataFrame({
+            'rolling_return': rolling_return,
+            'rolling_volatility': rolling_volatility,
+            'rolling_sharpe': rolling_sharpe,
+            'rolling_drawdown': rolling_drawdown
+        }, index=portfolio_data.index[1:][valid])
     
     def generate_performance_report(self, portfolio_data: pd.DataFrame, 
                                   filename: Optional[str] = None) -> str:
@@ -221,48 +379,24 @@ class PerformanceAnalyzer:
         risk_metrics = self.calculate_risk_metrics(portfolio_data)
         
         # Generate report
-        report = f"""
-ZerodhaWise Performance Report
-Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-{'='*50}
-
-RETURN METRICS:
-{'='*20}
-"""
+        rules = {'rule': '=' * 50, 'subrule': '=' * 20}
+        sections = [self._REPORT_HEADER_TEMPLATE.format_map(
+            dict(rules, generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        )]
         
         if 'error' not in returns_metrics:
-            report += f"""
-Total Return: {returns_metrics['total_return']:.2%}
-Annualized Return: {returns_metrics['annualized_return']:.2%}
-Average Daily Return: {returns_metrics['avg_daily_return']:.4%}
-30-Day Rolling Return: {returns_metrics['rolling_30d_return']:.2%}
-90-Day Rolling Return: {returns_metrics['rolling_90d_return']:.2%}
-Sharpe Ratio: {returns_metrics['sharpe_ratio']:.3f}
-Calmar Ratio: {returns_metrics['calmar_ratio']:.3f}
-Maximum Drawdown: {returns_metrics['max_drawdown']:.2%}
-"""
+            sections.append(self._RETURNS_TEMPLATE.format_map(returns_metrics))
         else:
-            report += f"Error: {returns_metrics['error']}\n"
+            sections.append(f"Error: {returns_metrics['error']}\n")
         
-        report += f"""
-RISK METRICS:
-{'='*20}
-"""
+        sections.append(self._RISK_HEADER_TEMPLATE.format_map(rules))
         
         if 'error' not in risk_metrics:
-            report += f"""
-Volatility (Annualized): {risk_metrics['volatility']:.2%}
-95% Value at Risk: {risk_metrics['var_95']:.2%}
-95% Conditional VaR: {risk_metrics['cvar_95']:.2%}
-Downside Deviation: {risk_metrics['downside_deviation']:.2%}
-Beta: {risk_metrics['beta']:.3f}
-Skewness: {risk_metrics['skewness']:.3f}
-Kurtosis: {risk_metrics['kurtosis']:.3f}
-99% Value at Risk: {risk_metrics['var_99']:.2%}
-99% Conditional VaR: {risk_metrics['cvar_99']:.2%}
-"""
+            sections.append(self._RISK_TEMPLATE.format_map(risk_metrics))
         else:
-            report += f"Error: {risk_metrics['error']}\n"
+            sections.append(f"Error: {risk_metrics['error']}\n")
+        
+        report = ''.join(sections)
         
         # Save report
         import os
@@ -275,24 +409,60 @@ Kurtosis: {risk_metrics['kurtosis']:.3f}
         self.logger.info(f"Performance report exported to {filepath}")
         return filepath
     
-    def _calculate_sharpe_ratio(self, returns: pd.Series, risk_free_rate: float = 0.02) -> float:
-        """Calculate Sharpe ratio."""
-        if returns.std() == 0:
+    def _compute_returns_array(self, portfolio_data: pd.DataFrame) -> np.ndarray:
+        """
+        Calculate simple daily returns of total_value as a float64 array.
+        
+        The result has one element fewer than portfolio_data and keeps NaNs
+        in place so it stays aligned with portfolio_data.index[1:].
+        """
+        values = portfolio_data['total_value'].to_numpy(dtype=np.float64)
+        return np.diff(values) / values[:-1]
+    
+    @staticmethod
+    def _sample_std(values: np.ndarray) -> float:
+        """Sample standard deviation (ddof=1); NaN for fewer than two values, like pandas."""
+        return float(np.std(values, ddof=1)) if values.size > 1 else np.nan
+    
+    def _calculate_sharpe_ratio(self, mean_return: float, std_return: float,
+                                risk_free_rate: float = 0.02) -> float:
+        """Calculate annualized Sharpe ratio from daily return mean and std."""
+        if std_return == 0 or np.isnan(std_return):
             return 0.0
         
-        excess_returns = returns.mean() - (risk_free_rate / 252)
-        return (excess_returns / returns.std()) * np.sqrt(252)
+        excess_returns = mean_return - (risk_free_rate / 252)
+        return float((excess_returns / std_return) * np.sqrt(252))
     
-    def _calculate_max_drawdown(self, portfolio_values: pd.Series) -> float:
-        """Calculate maximum drawdown."""
-        peak = portfolio_values.expanding().max()
-        drawdown = (portfolio_values - peak) / peak
-        return drawdown.min()
+    def _calculate_var_cvar(self, returns: np.ndarray, percentile: float) -> Tuple[float, float]:
+        """
+        Calculate historical VaR and CVaR at the given percentile.
+        
+        Uses a linear-time partition instead of a full sort. VaR matches
+        np.percentile's linear interpolation and CVaR is the mean of the
+        returns at or below it.
+        """
+        n = returns.size
+        position = (n - 1) * percentile / 100
+        lo = int(np.floor(position))
+        hi = min(lo + 1, n - 1)
+        
+        part = np.partition(returns, [lo, hi])
+        var = part[lo] + (position - lo) * (part[hi] - part[lo])
+        
+        # Everything left of lo is <= VaR; past it only exact ties with VaR can qualify
+        tail_sum = part[:lo + 1].sum()
+        tail_count = lo + 1
+        if hi > lo and part[hi] <= var:
+            ties = part[hi:] == var
+            tail_sum += part[hi:][ties].sum()
+            tail_count += int(ties.sum())
+        
+        return var, tail_sum / tail_count
     
-    def _calculate_calmar_ratio(self, annualized_return: float, portfolio_values: pd.Series) -> float:
-        """Calculate Calmar ratio."""
-        max_drawdown = abs(self._calculate_max_drawdown(portfolio_values))
-        return annualized_return / max_drawdown if max_drawdown > 0 else 0
+    def _calculate_calmar_ratio(self, annualized_return: float, max_drawdown: float) -> float:
+        """Calculate Calmar ratio from the annualized return and max drawdown."""
+        max_drawdown = abs(max_drawdown)
+        return float(annualized_return / max_drawdown) if max_drawdown > 0 else 0
     
     def _calculate_beta(self, portfolio_returns: pd.Series, 
                        market_returns: Optional[pd.Series] = None) -> float:
@@ -302,21 +472,50 @@ Kurtosis: {risk_metrics['kurtosis']:.3f}
             return 1.0
         
         # Align returns
-        common_dates = portfolio_returns.index.intersection(market_returns.index)
-        if len(common_dates) < 2:
+        portfolio_aligned, market_aligned = self._align_returns(portfolio_returns, market_returns)
+        
+        # Calculate beta
+        return self._beta_from_aligned(portfolio_aligned, market_aligned)
+    
+    def _beta_from_aligned(self, portfolio_aligned: np.ndarray, market_aligned: np.ndarray) -> float:
+        """Calculate beta from return arrays that are already date-aligned."""
+        if len(portfolio_aligned) < 2:
             return 1.0
+        return _beta_kernel(portfolio_aligned, market_aligned)
+    
+    @staticmethod
+    def _align_returns(left: pd.Series, right: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Align two return series on their common index labels.
         
-        portfolio_aligned = portfolio_returns.loc[common_dates]
-        market_aligned = market_returns.loc[common_dates]
+        Matches the sorted index keys directly (int64 nanoseconds for
+        datetime indexes) instead of building an Index intersection and
+        gathering with .loc.
         
-        # Calculate beta
-        covariance = np.cov(portfolio_aligned, market_aligned)[0, 1]
-        market_variance = np.var(market_aligned)
+        Returns:
+            Tuple of contiguous float64 arrays over the shared labels, in sorted order.
+        """
+        def keys(index: pd.Index) -> np.ndarray:
+            return index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
         
-        return covariance / market_variance if market_variance > 0 else 1.0
+        _, left_pos, right_pos = np.intersect1d(
+            keys(left.index), keys(right.index), return_indices=True
+        )
+        return (
+            np.ascontiguousarray(left.to_numpy(dtype=np.float64)[left_pos]),
+            np.ascontiguousarray(right.to_numpy(dtype=np.float64)[right_pos])
+        )
+    
+    @staticmethod
+    def _correlation(x: np.ndarray, y: np.ndarray) -> float:
+        """Pearson correlation; NaN when undefined, like pandas Series.corr."""
+        if len(x) < 2:
+            return np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(np.corrcoef(x, y)[0, 1])
     
     def _calculate_rolling_drawdown(self, portfolio_values: pd.Series, window: int) -> pd.Series:
         """Calculate rolling drawdown."""
-        rolling_peak = portfolio_values.rolling(window).max()
-        drawdown = (portfolio_values - rolling_peak) / rolling_peak
-        return drawdown 
\ No newline at end of file
+        values = np.ascontiguousarray(portfolio_values.to_numpy(dtype=np.float64))
+        drawdown = _rolling_drawdown_kernel(values, window)
+        return pd.Series(drawdown, index=portfolio_values.index) 
\ No newline at end of file
@@ -6,19 +6,111 @@ portfolio fetching, analysis, and management.
 """
 import sys
 import os
+import atexit
+import copy
+import functools
+import time
+from collections import ChainMap, namedtuple
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 import logging
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+import orjson
 from kiteconnect import KiteConnect
-from utils import load_config, setup_logging
+from utils import load_config, setup_logging, get_project_root, njit
 from data import DataManager
 import webbrowser
 from urllib.parse import urlparse, parse_qs
 
 
+@njit(cache=True)
+def _holdings_kernel(market_values: np.ndarray, pnls: np.ndarray,
+                     sector_ids: np.ndarray, n_sectors: int):
+    """
+    Sector and P&L aggregates of the holdings in a single pass.
+    
+    Returns (sector_sum, sector_count, total_value, total_pnl, positive_pnl,
+    negative_pnl, positive_count, negative_count, best_idx, worst_idx); the
+    best/worst indices are -1 when there are no holdings.
+    """
+    sector_sum = np.zeros(n_sectors)
+    sector_count = np.zeros(n_sectors, dtype=np.int64)
+    total_value = 0.0
+    total_pnl = 0.0
+    positive_pnl = 0.0
+    negative_pnl = 0.0
+    positive_count = 0
+    negative_count = 0
+    best_idx = -1
+    worst_idx = -1
+    for i in range(market_values.shape[0]):
+        market_value = market_values[i]
+        pnl = pnls[i]
+        sector = sector_ids[i]
+        sector_sum[sector] += market_value
+        sector_count[sector] += 1
+        total_value += market_value
+        total_pnl += pnl
+        if pnl > 0:
+            positive_pnl += pnl
+            positive_count += 1
+        elif pnl < 0:
+            negative_pnl += pnl
+            negative_count += 1
+        if best_idx < 0 or pnl > pnls[best_idx]:
+            best_idx = i
+        if worst_idx < 0 or pnl < pnls[worst_idx]:
+            worst_idx = i
+    return (sector_sum, sector_count, total_value, total_pnl, positive_pnl,
+            negative_pnl, positive_count, negative_count, best_idx, worst_idx)
+
+
+# NSE ticker details written by utils.get_sector_details_for_nse_stocks
+_TICKER_INFO_PATH = os.path.join(get_project_root(), 'data', 'nse_ticker_info.json')
+
+
+def _ticker_info_version() -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of the NSE ticker details file, or None when it is missing."""
+    try:
+        stat = os.stat(_TICKER_INFO_PATH)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@functools.lru_cache(maxsize=2)
+def _load_ticker_info(version: Optional[Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    Load the NSE ticker details, if present.
+    
+    ``version`` comes from _ticker_info_version and only keys the cache, so a
+    rewritten file is read again instead of being served from memory.
+    """
+    if version is None:
+        return {}
+    try:
+        with open(_TICKER_INFO_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+@functools.lru_cache(maxsize=4096)
+def _classify_sector(symbol: Optional[str], version: Optional[Tuple[int, int]] = None) -> str:
+    """Sector for a trading symbol from the NSE ticker details, or 'Unknown'; memoized per symbol and file version."""
+    info = _load_ticker_info(version).get(symbol) or {}
+    return info.get('sector') or 'Unknown'
+
+
+# Structure-of-arrays view of a holdings list: one array per field, aligned by position
+_HoldingsSoA = namedtuple(
+    '_HoldingsSoA', ['tradingsymbol', 'exchange', 'quantity', 'market_value', 'pnl', 'sector']
+)
+
+
 class PortfolioAnalyzer:
     """
     Main class for portfolio analysis and management.
@@ -26,6 +118,25 @@ class PortfolioAnalyzer:
     This class provides methods to fetch, analyze, and manage Zerodha portfolio data.
     """
     
+    # Seconds a cached Kite response stays fresh, per endpoint
+    KITE_CACHE_TTL = {'holdings': 60, 'positions': 60, 'margins': 10}
+    
+    _SUMMARY_TEMPLATE = """
+Portfolio Summary
+================
+Total Value: ₹{total_value:,.2f}
+Total P&L: ₹{total_pnl:,.2f} ({total_pnl_percentage:.2f}%)
+Number of Holdings: {number_of_holdings}
+
+Top Sectors:
+{sector_lines}
+P&L Analysis:
+- Positive P&L Stocks: {positive_count}
+- Negative P&L Stocks: {negative_count}
+- Total Positive P&L: ₹{total_positive_pnl:,.2f}
+- Total Negative P&L: ₹{total_negative_pnl:,.2f}
+"""
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize the PortfolioAnalyzer.
@@ -35,13 +146,34 @@ class PortfolioAnalyzer:
         """
         if config_path is None:
             config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.yaml')
-
+        
         self.config = load_config(config_path)
         self.logger = setup_logging(__name__)
         self.data_manager = DataManager(self.config)
         
+        # Snapshots are persisted off the fetch path; pending writes finish at exit
+        self._save_executor = ThreadPoolExecutor(max_workers=1)
+        atexit.register(self._save_executor.shutdown, wait=True)
+        
+        # Recent Kite responses per endpoint, with the monotonic time they were fetched.
+        # Kept in memory only so account data never lands on disk.
+        self._kite_cache: Dict[str, Tuple[float, Any]] = {}
+        
+        # Most recent get_portfolio result and the monotonic time it was fetched
+        self._last_portfolio: Optional[Tuple[Dict[str, Any], float]] = None
+        
+        # Per-instance cache so repeated windows don't hit the database again
+        self.get_historical_portfolio = functools.lru_cache(maxsize=4)(
+            self._get_historical_portfolio_impl
+        )
+        
         # Initialize Kite Connect
-        self.kite = KiteConnect(api_key=self.config['zerodha']['api_key'])
+        # KiteConnect keeps one requests.Session; size its HTTPS pool so the
+        # concurrent holdings/positions/margins calls reuse kept-alive connections
+        self.kite = KiteConnect(
+            api_key=self.config['zerodha']['api_key'],
+            pool={'pool_connections': 4, 'pool_maxsize': 4}
+        )
         # print(self.kite.login_url())
         import yaml
 
@@ -88,14 +220,14 @@ class PortfolioAnalyzer:
         try:
             self.logger.info("Fetching portfolio data from Zerodha...")
             
-            # Fetch holdings
-            holdings = self.kite.holdings()
-            
-            # Fetch positions
-            positions = self.kite.positions()
-            
-            # Fetch margins
-            margins = self.kite.margins()
+            # Holdings, positions and margins are independent requests; overlap them
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                holdings_future = executor.submit(self._cached_kite_call, 'holdings')
+                positions_future = executor.submit(self._cached_kite_call, 'positions')
+                margins_future = executor.submit(self._cached_kite_call, 'margins')
+                holdings = holdings_future.result()
+                positions = positions_future.result()
+                margins = margins_future.result()
             
             portfolio = {
                 'holdings': holdings,
@@ -104,8 +236,11 @@ class PortfolioAnalyzer:
                 'timestamp': datetime.now().isoformat()
             }
             
-            # Save to database
-            self.data_manager.save_portfolio(portfolio)
+            self._last_portfolio = (portfolio, time.monotonic())
+            
+            # Save to database in the background; nothing below waits for it. The save
+            # gets its own copy, since callers and analyze_portfolio edit this one
+            self._save_executor.submit(self.data_manager.save_portfolio, copy.deepcopy(portfolio))
             
             self.logger.info(f"Successfully fetched portfolio with {len(holdings)} holdings")
             return portfolio
@@ -114,37 +249,98 @@ class PortfolioAnalyzer:
             self.logger.error(f"Error fetching portfolio: {str(e)}")
             raise
     
-    def analyze_portfolio(self, portfolio: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _cached_kite_call(self, endpoint_name: str, ttl_seconds: Optional[float] = None) -> Any:
+        """
+        Call a Kite endpoint, reusing a recent response cached in memory.
+        
+        Cached responses are deep-copied on the way out so callers can
+        annotate them (e.g. market_value) without touching the cache.
+        
+        Args:
+            endpoint_name: Name of the KiteConnect method, e.g. 'holdings'.
+            ttl_seconds: Maximum age of a cached response. Defaults to KITE_CACHE_TTL.
+            
+        Returns:
+            The endpoint's response, fresh or from the cache.
+        """
+        if ttl_seconds is None:
+            ttl_seconds = self.KITE_CACHE_TTL.get(endpoint_name, 0)
+        
+        now = time.monotonic()
+        entry = self._kite_cache.get(endpoint_name)
+        if entry is not None and now - entry[0] < ttl_seconds:
+            return copy.deepcopy(entry[1])
+        
+        data = getattr(self.kite, endpoint_name)()
+        self._kite_cache[endpoint_name] = (now, data)
+        return copy.deepcopy(data)
+    
+    def analyze_portfolio(self, portfolio: Optional[Dict[str, Any]] = None,
+                          top_n: int = 10, max_age_seconds: float = 0.0,
+                          precomputed: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, Any]:
         """
         Analyze portfolio performance and composition.
         
+        Holdings without a 'sector' are grouped under the sector recorded for
+        their symbol in data/nse_ticker_info.json, or 'Unknown' if it has none.
+        
         Args:
             portfolio: Portfolio data. If None, fetches current portfolio.
+            top_n: Number of largest holdings to return in 'top_holdings'.
+            max_age_seconds: When portfolio is None, reuse the last fetched
+                portfolio if it is younger than this instead of fetching again.
+            precomputed: Optional (amounts, prices) float64 arrays aligned with
+                the holdings, as built by value_arrays. When given, total value
+                is a single dot product.
             
         Returns:
             Dictionary containing portfolio analysis results.
         """
+        now_iso = datetime.now().isoformat()
+        
         if portfolio is None:
-            portfolio = self.get_portfolio()
+            if (self._last_portfolio is not None
+                    and time.monotonic() - self._last_portfolio[1] < max_age_seconds):
+                portfolio = self._last_portfolio[0]
+            else:
+                portfolio = self.get_portfolio()
         
-        holdings = portfolio['holdings']
+        holdings = portfolio.get('holdings') or []
         
-        # Calculate basic metrics
-        total_value = sum(float(holding['quantity']* holding['close_price']) for holding in holdings)
-        total_pnl = sum(float(holding['pnl']) for holding in holdings)
+        if not holdings:
+            # Nothing to aggregate; skip the array conversion and kernel entirely
+            return {
+                'total_value': 0.0,
+                'total_pnl': 0.0,
+                'total_pnl_percentage': 0,
+                'number_of_holdings': 0,
+                'sector_analysis': {},
+                'top_holdings': [],
+                'pnl_analysis': {
+                    'positive_count': 0,
+                    'negative_count': 0,
+                    'total_positive_pnl': 0.0,
+                    'total_negative_pnl': 0.0,
+                    'best_performer': None,
+                    'worst_performer': None
+                },
+                'timestamp': now_iso
+            }
         
         # Add calculated market_value to each holding for consistency
         for holding in holdings:
-            holding['market_value'] = float(holding['quantity']) * float(holding['close_price'])
+            if 'close_price' in holding:
+                holding['market_value'] = float(holding['quantity']) * float(holding['close_price'])
         
-        # Sector analysis
-        sector_analysis = self._analyze_sectors(holdings)
+        # Columnar view of the holdings; sector and P&L aggregates come from one kernel pass
+        soa = self._holdings_soa(holdings)
+        sector_analysis, pnl_analysis, total_value, total_pnl = self._aggregate_holdings(holdings, soa)
+        if precomputed is not None:
+            amounts, prices = precomputed
+            total_value = float(np.vdot(amounts, prices))
         
         # Top holdings
-        top_holdings = sorted(holdings, key=lambda x: float(x['market_value']), reverse=True)[:10]
-        
-        # P&L analysis
-        pnl_analysis = self._analyze_pnl(holdings)
+        top_holdings = [holdings[i] for i in self._top_indices(soa.market_value, top_n)]
         
         analysis = {
             'total_value': total_value,
@@ -154,77 +350,157 @@ class PortfolioAnalyzer:
             'sector_analysis': sector_analysis,
             'top_holdings': top_holdings,
             'pnl_analysis': pnl_analysis,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso
         }
         
         return analysis
     
-    def _analyze_sectors(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze portfolio by sectors."""
-        sector_data = {}
+    @staticmethod
+    def value_arrays(holdings: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the (amounts, prices) arrays for analyze_portfolio's precomputed argument.
         
-        for holding in holdings:
-            sector = holding.get('sector', 'Unknown')
-            # Calculate market_value if not present
-            if 'market_value' not in holding:
-                market_value = float(holding['quantity']) * float(holding['close_price'])
-            else:
-                market_value = float(holding['market_value'])
-            
-            if sector not in sector_data:
-                sector_data[sector] = {
-                    'total_value': 0,
-                    'holdings': [],
-                    'count': 0
-                }
+        A holding with a close_price contributes its quantity and close_price;
+        one with only a market_value contributes 1 and that value, so the dot
+        product of the two arrays is the portfolio's total value either way.
+        """
+        n = len(holdings)
+        amounts = np.fromiter(
+            (h['quantity'] if 'close_price' in h else 1.0 for h in holdings),
+            dtype=np.float64, count=n
+        )
+        prices = np.fromiter(
+            (h['close_price'] if 'close_price' in h else h['market_value'] for h in holdings),
+            dtype=np.float64, count=n
+        )
+        return amounts, prices
+    
+    @staticmethod
+    def _top_indices(values: np.ndarray, n: int) -> np.ndarray:
+        """Indices of the n largest values, largest first, ties in original order."""
+        if n <= 0 or values.size == 0:
+            return np.empty(0, dtype=np.intp)
+        if n < values.size:
+            # O(N) partial selection, then order only the n winners
+            idx = np.sort(np.argpartition(-values, n - 1)[:n])
+        else:
+            idx = np.arange(values.size)
+        return idx[np.argsort(-values[idx], kind='stable')]
+    
+    def _holdings_soa(self, holdings: List[Dict[str, Any]]) -> _HoldingsSoA:
+        """
+        Convert holdings to a structure of arrays.
+        
+        Numeric fields are float64 arrays (quantity keeps its parsed dtype),
+        string fields are object arrays, and sector is a Categorical with
+        categories in first-seen order so aggregations work on integer codes.
+        The arrays are a snapshot: callers build them once per analysis and
+        pass them along, so edits to the holdings are seen on the next call.
+        
+        Holdings without a 'sector' take the yfinance sector recorded for their
+        symbol in data/nse_ticker_info.json, and 'Unknown' when the file or the
+        symbol is missing.
+        """
+        n = len(holdings)
+        market_values = np.fromiter(
+            (float(h['quantity']) * float(h['close_price']) if 'close_price' in h
+             else float(h['market_value'])
+             for h in holdings),
+            dtype=np.float64, count=n
+        )
+        pnls = np.fromiter((float(h['pnl']) for h in holdings), dtype=np.float64, count=n)
+        # Kite holdings carry no sector; classify those once per unique symbol
+        version = _ticker_info_version()
+        sectors = [h.get('sector') or _classify_sector(h.get('tradingsymbol'), version) for h in holdings]
+        sector_codes, sector_names = pd.factorize(pd.Series(sectors, dtype=object), sort=False)
+        
+        soa = _HoldingsSoA(
+            tradingsymbol=np.asarray([h.get('tradingsymbol') for h in holdings], dtype=object),
+            exchange=np.asarray([h.get('exchange') for h in holdings], dtype=object),
+            quantity=np.asarray([h['quantity'] for h in holdings]),
+            market_value=market_values,
+            pnl=pnls,
+            sector=pd.Categorical.from_codes(sector_codes, categories=sector_names)
+        )
+        return soa
+    
+    def _aggregate_holdings(self, holdings: List[Dict[str, Any]],
+                            soa: Optional[_HoldingsSoA] = None
+                            ) -> Tuple[Dict[str, Any], Dict[str, Any], float, float]:
+        """
+        Compute the sector and P&L analyses together.
+        
+        Args:
+            holdings: List of holdings.
+            soa: Output of _holdings_soa for the holdings, if already built.
             
-            sector_data[sector]['total_value'] += market_value
-            sector_data[sector]['holdings'].append(holding)
-            sector_data[sector]['count'] += 1
+        Returns:
+            Tuple of (sector analysis, P&L analysis, total market value, total P&L).
+        """
+        if soa is None:
+            soa = self._holdings_soa(holdings)
+        
+        # Category codes are in first-seen order, so the sector dict keeps that order
+        sector_ids = soa.sector.codes
+        sectors = soa.sector.categories
+        (sector_sum, sector_count, total_value, total_pnl, positive_pnl, negative_pnl,
+         positive_count, negative_count, best_idx, worst_idx) = _holdings_kernel(
+            soa.market_value, soa.pnl, sector_ids.astype(np.int64), len(sectors)
+        )
+        
+        sector_holdings = [[] for _ in range(len(sectors))]
+        for holding, sector_id in zip(holdings, sector_ids.tolist()):
+            sector_holdings[sector_id].append(holding)
         
         # Calculate percentages
-        total_value = sum(data['total_value'] for data in sector_data.values())
+        sector_total = sector_sum.sum()
+        sector_data = {}
+        for k, sector in enumerate(sectors):
+            sector_data[sector] = {
+                'total_value': float(sector_sum[k]),
+                'holdings': sector_holdings[k],
+                'count': int(sector_count[k]),
+                'percentage': float(sector_sum[k] / sector_total * 100) if sector_total > 0 else 0
+            }
         
-        for sector in sector_data:
-            sector_data[sector]['percentage'] = (
-                sector_data[sector]['total_value'] / total_value * 100
-            ) if total_value > 0 else 0
+        pnl_data = {
+            'positive_count': int(positive_count),
+            'negative_count': int(negative_count),
+            'total_positive_pnl': float(positive_pnl),
+            'total_negative_pnl': float(negative_pnl),
+            'best_performer': holdings[best_idx] if best_idx >= 0 else None,
+            'worst_performer': holdings[worst_idx] if worst_idx >= 0 else None
+        }
         
-        return sector_data
+        return sector_data, pnl_data, float(total_value), float(total_pnl)
+    
+    def _analyze_sectors(self, holdings: List[Dict[str, Any]],
+                         soa: Optional[_HoldingsSoA] = None) -> Dict[str, Any]:
+        """Analyze portfolio by sectors."""
+        return self._aggregate_holdings(holdings, soa)[0]
     
-    def _analyze_pnl(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_pnl(self, holdings: List[Dict[str, Any]],
+                     soa: Optional[_HoldingsSoA] = None) -> Dict[str, Any]:
         """Analyze P&L distribution."""
-        positive_pnl = [h for h in holdings if float(h['pnl']) > 0]
-        negative_pnl = [h for h in holdings if float(h['pnl']) < 0]
-        
-        return {
-            'positive_count': len(positive_pnl),
-            'negative_count': len(negative_pnl),
-            'total_positive_pnl': sum(float(h['pnl']) for h in positive_pnl),
-            'total_negative_pnl': sum(float(h['pnl']) for h in negative_pnl),
-            'best_performer': max(holdings, key=lambda x: float(x['pnl'])) if holdings else None,
-            'worst_performer': min(holdings, key=lambda x: float(x['pnl'])) if holdings else None
-        }
+        return self._aggregate_holdings(holdings, soa)[1]
     
-    def get_portfolio_summary(self) -> str:
+    def get_portfolio_summary(self, portfolio: Optional[Dict[str, Any]] = None,
+                              analysis: Optional[Dict[str, Any]] = None) -> str:
         """
         Get a formatted summary of the portfolio.
         
+        Args:
+            portfolio: Portfolio data. If None, fetches current portfolio.
+            analysis: Result of analyze_portfolio. If given, the portfolio is
+                neither fetched nor analyzed again.
+            
         Returns:
             Formatted string containing portfolio summary.
         """
-        portfolio = self.get_portfolio()
-        analysis = self.analyze_portfolio(portfolio)
-        
-        summary = f"""
-Portfolio Summary
-================
-Total Value: ₹{analysis['total_value']:,.2f}
-Total P&L: ₹{analysis['total_pnl']:,.2f} ({analysis['total_pnl_percentage']:.2f}%)
-Number of Holdings: {analysis['number_of_holdings']}
-
-Top Sectors:
-"""
+        if analysis is None:
+            if portfolio is None:
+                portfolio = self.get_portfolio()
+            analysis = self.analyze_portfolio(portfolio)
         
         # Add top sectors
         sectors = sorted(
@@ -232,24 +508,23 @@ Top Sectors:
             key=lambda x: x[1]['total_value'],
             reverse=True
         )[:5]
+        sector_lines = "".join(
+            f"- {sector}: {data['percentage']:.1f}% (₹{data['total_value']:,.2f})\n"
+            for sector, data in sectors
+        )
         
-        for sector, data in sectors:
-            summary += f"- {sector}: {data['percentage']:.1f}% (₹{data['total_value']:,.2f})\n"
-        
-        summary += f"""
-P&L Analysis:
-- Positive P&L Stocks: {analysis['pnl_analysis']['positive_count']}
-- Negative P&L Stocks: {analysis['pnl_analysis']['negative_count']}
-- Total Positive P&L: ₹{analysis['pnl_analysis']['total_positive_pnl']:,.2f}
-- Total Negative P&L: ₹{analysis['pnl_analysis']['total_negative_pnl']:,.2f}
-"""
+        summary = self._SUMMARY_TEMPLATE.format_map(ChainMap(
+            {'sector_lines': sector_lines}, analysis, analysis['pnl_analysis']
+        ))
         
         return summary
     
-    def get_historical_portfolio(self, days: int = 30) -> pd.DataFrame:
+    def _get_historical_portfolio_impl(self, days: int = 30) -> pd.DataFrame:
         """
         Get historical portfolio data.
         
+        Exposed as ``get_historical_portfolio``, memoized per instance by ``days``.
+        
         Args:
             days: Number of days to fetch historical data.
             
@@ -258,58 +533,93 @@ P&L Analysis:
         """
         return self.data_manager.get_historical_portfolio(days)
     
-    def export_portfolio_report(self, filename: str = None) -> str:
+    def iter_historical_portfolio(self, days: int = 30, chunk_days: int = 7) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over historical portfolio data one window at a time.
+        
+        Args:
+            days: Number of days to fetch historical data.
+            chunk_days: Width of each yielded window in days.
+            
+        Returns:
+            Iterator of DataFrames, oldest window first.
+        """
+        return self.data_manager.iter_historical_portfolio(days, chunk_days)
+    
+    def export_portfolio_report(self, filename: str = None,
+                                portfolio: Optional[Dict[str, Any]] = None,
+                                holdings_df: Optional[pd.DataFrame] = None) -> str:
         """
         Export portfolio analysis to a file.
         
         Args:
             filename: Output filename. If None, generates default name.
+            portfolio: Portfolio data. If None, fetches current portfolio.
+            holdings_df: Optional DataFrame of the holdings with float
+                'market_value' and 'pnl' columns, in the same order as
+                portfolio['holdings']. The detailed holdings are then read
+                from its columns instead of being converted again.
             
         Returns:
             Path to the exported file.
         """
+        # One clock read shared by the filename and the "Generated" line
+        now = datetime.now()
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             filename = f"portfolio_report_{timestamp}.txt"
         
-        portfolio = self.get_portfolio()
+        if portfolio is None:
+            portfolio = self.get_portfolio()
         analysis = self.analyze_portfolio(portfolio)
-        summary = self.get_portfolio_summary()
+        summary = self.get_portfolio_summary(analysis=analysis)
+        
+        if holdings_df is not None:
+            market_values = holdings_df['market_value'].to_numpy(dtype=np.float64)
+            pnls = holdings_df['pnl'].to_numpy(dtype=np.float64)
+            # Columns the holdings lack (e.g. no 'exchange') are printed as None
+            symbols, exchanges, quantities = (
+                holdings_df[column].tolist() if column in holdings_df else [None] * len(holdings_df)
+                for column in ('tradingsymbol', 'exchange', 'quantity')
+            )
+        else:
+            soa = self._holdings_soa(portfolio['holdings'])
+            market_values = soa.market_value
+            pnls = soa.pnl
+            symbols = soa.tradingsymbol.tolist()
+            exchanges = soa.exchange.tolist()
+            quantities = soa.quantity.tolist()
+        
+        # P&L percentages for every row at once; zero where there is no market value
+        positive = market_values > 0
+        pnl_percentages = np.divide(pnls * 100, market_values,
+                                    out=np.zeros_like(pnls), where=positive)
+        
+        os.makedirs('reports', exist_ok=True)
+        filepath = os.path.join('reports', filename)
         
-        # Create detailed report
-        report = f"""
+        # Stream the report through a 64 KB buffer instead of building it in memory
+        with open(filepath, 'w', buffering=1 << 16) as f:
+            f.write(f"""
 ZerodhaWise Portfolio Report
-Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+Generated: {now:%Y-%m-%d %H:%M:%S}
 {'='*50}
 
 {summary}
 
 Detailed Holdings:
-"""
-        
-        holdings = portfolio['holdings']
-        for i, holding in enumerate(holdings, 1):
-            # Calculate market_value if not present
-            if 'market_value' not in holding:
-                market_value = float(holding['quantity']) * float(holding['close_price'])
-            else:
-                market_value = float(holding['market_value'])
-                
-            report += f"""
-{i}. {holding['tradingsymbol']} ({holding['exchange']})
-    Quantity: {holding['quantity']}
+""")
+            
+            rows = zip(symbols, exchanges, quantities,
+                       market_values.tolist(), pnls.tolist(), pnl_percentages.tolist())
+            for i, (symbol, exchange, quantity, market_value, pnl, pnl_percentage) in enumerate(rows, 1):
+                f.write(f"""
+{i}. {symbol} ({exchange})
+    Quantity: {quantity}
     Market Value: ₹{market_value:,.2f}
-    P&L: ₹{float(holding['pnl']):,.2f}
-    P&L %: {(float(holding['pnl']) / market_value * 100):.2f}%
-"""
-        
-        # Save report
-        import os
-        os.makedirs('reports', exist_ok=True)
-        filepath = os.path.join('reports', filename)
-        
-        with open(filepath, 'w') as f:
-            f.write(report)
+    P&L: ₹{pnl:,.2f}
+    P&L %: {pnl_percentage:.2f}%
+""")
         
         self.logger.info(f"Portfolio report exported to {filepath}")
         return filepath 
\ No newline at end of file
@@ -5,25 +5,136 @@ This module provides comprehensive risk analysis including
 portfolio risk assessment, diversification analysis, and risk metrics.
 """
 
+import copy
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import functools
+from collections import defaultdict, namedtuple
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from scipy import stats
-from sklearn.decomposition import PCA
-from utils import load_config, setup_logging
+from utils import load_config, setup_logging, njit
 from data import DataManager
 
 
+@functools.lru_cache(maxsize=8)
+def _norm_ppf(probability: float) -> float:
+    """Standard normal quantile, memoized since only a few confidence levels are ever used."""
+    return float(stats.norm.ppf(probability))
+
+
+@njit(cache=True, fastmath=True)
+def _hhi_kernel(weights: np.ndarray) -> float:
+    """Sum of squared portfolio weights."""
+    hhi = 0.0
+    for i in range(weights.shape[0]):
+        hhi += weights[i] * weights[i]
+    return hhi
+
+
+@njit(cache=True, fastmath=True)
+def _portfolio_kernel(market_values: np.ndarray, volatilities: np.ndarray):
+    """
+    Value-weighted portfolio aggregates in one pass.
+    
+    Returns (total_value, weighted_volatility, hhi); the weighted figures
+    are 0 when the total value is not positive.
+    """
+    total = 0.0
+    for i in range(market_values.shape[0]):
+        total += market_values[i]
+    
+    weighted_volatility = 0.0
+    hhi = 0.0
+    if total > 0:
+        for i in range(market_values.shape[0]):
+            weight = market_values[i] / total
+            weighted_volatility += weight * volatilities[i]
+            hhi += weight * weight
+    return total, weighted_volatility, hhi
+
+
+# Holdings columns as arrays, aligned with the holdings list they came from
+_HoldingsSoA = namedtuple('_HoldingsSoA', ['tradingsymbol', 'sector', 'market_value', 'pnl'])
+
+# Everything analyze_portfolio_risk needs from the holdings, gathered in one pass
+_RiskInputs = namedtuple(
+    '_RiskInputs',
+    ['market_values', 'pnls', 'total_value', 'total_pnl', 'sector_data']
+)
+
+
+class _HoldingsKey:
+    """
+    Hashable stand-in for a holdings list, equal to any list with the same contents.
+    
+    The list itself is only carried to the uncached analysis; RiskAnalyzer._memoized
+    drops it once the call returns, so cached keys hold just the fingerprint.
+    """
+    
+    __slots__ = ('holdings', 'fingerprint', '_hash')
+    
+    def __init__(self, holdings: List[Dict[str, Any]]):
+        self.holdings = holdings
+        self.fingerprint = tuple(
+            (h.get('tradingsymbol'), h.get('sector'), h.get('quantity'),
+             h.get('close_price'), h.get('market_value'), h.get('pnl'))
+            for h in holdings
+        )
+        self._hash = hash(self.fingerprint)
+    
+    def __hash__(self) -> int:
+        return self._hash
+    
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _HoldingsKey) and self.fingerprint == other.fingerprint
+
+
 class RiskAnalyzer:
     """
     Class for analyzing portfolio risk and diversification.
     
     This class provides methods to calculate various risk metrics
-    and analyze portfolio diversification.
+    and analyze portfolio diversification. Results of the public analyses
+    are memoized on the holdings' contents; call clear_cache() to drop them.
     """
     
+    # Weights of the concentration, sector and volatility scores in the overall risk score
+    _RISK_SCORE_WEIGHTS = np.array([0.3, 0.3, 0.4])
+    
+    # Report sections, filled with format_map by generate_risk_report
+    _REPORT_HEADER_TEMPLATE = """
+ZerodhaWise Risk Analysis Report
+Generated: {generated}
+==================================================
+
+PORTFOLIO RISK OVERVIEW:
+==============================
+"""
+    _RISK_OVERVIEW_TEMPLATE = """
+Total Portfolio Value: ₹{total_portfolio_value:,.2f}
+Total P&L: ₹{total_pnl:,.2f}
+Portfolio Volatility: {portfolio_volatility:.2%}
+95% Value at Risk: {var_95:.2%}
+99% Value at Risk: {var_99:.2%}
+Risk Score: {risk_score:.2f}/10
+Diversification Score: {diversification_score:.2f}/10
+"""
+    _DIVERSIFICATION_HEADER = """
+DIVERSIFICATION ANALYSIS:
+==============================
+"""
+    _DIVERSIFICATION_TEMPLATE = """
+Herfindahl-Hirschman Index: {herfindahl_hirschman_index:.3f}
+Effective Number of Stocks: {effective_number_of_stocks:.1f}
+"""
+    _RECOMMENDATIONS_HEADER = """
+RISK RECOMMENDATIONS:
+==============================
+"""
+    _ERROR_TEMPLATE = "Error: {error}\n"
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize the RiskAnalyzer.
@@ -34,13 +145,140 @@ class RiskAnalyzer:
         self.config = load_config(config_path)
         self.logger = setup_logging(__name__)
         self.data_manager = DataManager(self.config)
+        
+        # Per-instance cache so the same symbol set isn't re-read and re-correlated
+        self._correlation_matrix = functools.lru_cache(maxsize=16)(self._correlation_matrix_impl)
+        
+        # Holdings list last converted by _to_soa, and its arrays
+        self._soa_cache: Optional[Tuple[List[Dict[str, Any]], _HoldingsSoA]] = None
+        
+        # Per-instance caches of the public analyses, keyed on the holdings' contents;
+        # the ones that read market data are also keyed on the date, like _symbol_correlation
+        self._last_key: Optional[_HoldingsKey] = None
+        self._risk_cache = functools.lru_cache(maxsize=32)(self._analyze_portfolio_risk_impl)
+        self._diversification_cache = functools.lru_cache(maxsize=32)(self._analyze_diversification_impl)
+        self._metrics_cache = functools.lru_cache(maxsize=32)(self._calculate_risk_metrics_impl)
     
-    def _calculate_market_value(self, holding: Dict[str, Any]) -> float:
-        """Calculate market value from quantity and close_price."""
-        if 'market_value' in holding:
-            return float(holding['market_value'])
-        else:
-            return float(holding['quantity']) * float(holding['close_price'])
+    def clear_cache(self):
+        """
+        Drop all memoized analyses, converted holdings and correlation matrices.
+        
+        Call after loading new market data during the day; results that read it
+        are otherwise reused until the date changes.
+        """
+        self._risk_cache.cache_clear()
+        self._diversification_cache.cache_clear()
+        self._metrics_cache.cache_clear()
+        self._correlation_matrix.cache_clear()
+        self._soa_cache = None
+        self._last_key = None
+    
+    def _holdings_key(self, holdings: List[Dict[str, Any]]) -> _HoldingsKey:
+        """Cache key for the holdings; also drops converted arrays that no longer match them."""
+        key = _HoldingsKey(holdings)
+        if key != self._last_key:
+            # The list may have been edited in place since _to_soa last saw it
+            self._soa_cache = None
+            self._last_key = key
+        return key
+    
+    def _memoized(self, cache: Any, holdings: List[Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+        """
+        Look the holdings up in one of the analysis caches.
+        
+        Returns a deep copy, so callers may edit the result without changing
+        what later callers get back.
+        """
+        key = self._holdings_key(holdings)
+        try:
+            result = cache(key, *args)
+        finally:
+            # The cache keeps the key; it needs the fingerprint, not the caller's list
+            key.holdings = None
+        return copy.deepcopy(result)
+    
+    def _to_soa(self, holdings: List[Dict[str, Any]]) -> _HoldingsSoA:
+        """
+        Convert holdings to a structure of arrays, once per holdings list.
+        
+        Market value and P&L are read-only float64 arrays; symbol and sector
+        are object arrays. Market value is the holding's 'market_value' when
+        present, otherwise quantity times close_price. Fields are converted by
+        NumPy as the arrays are filled, not cast one value at a time. The
+        result is reused while the same list object is passed in, so a
+        report's three analyses share one conversion.
+        """
+        if self._soa_cache is not None and self._soa_cache[0] is holdings:
+            return self._soa_cache[1]
+        
+        n = len(holdings)
+        market_values = np.fromiter(
+            (h.get('market_value', 0.0) for h in holdings), dtype=np.float64, count=n
+        )
+        has_value = np.fromiter(('market_value' in h for h in holdings), dtype=bool, count=n)
+        if not has_value.all():
+            priced = [h for h in holdings if 'market_value' not in h]
+            quantities = np.fromiter((h['quantity'] for h in priced), dtype=np.float64, count=len(priced))
+            close_prices = np.fromiter((h['close_price'] for h in priced), dtype=np.float64, count=len(priced))
+            market_values[~has_value] = quantities * close_prices
+        pnls = np.fromiter((h.get('pnl', 0.0) for h in holdings), dtype=np.float64, count=n)
+        market_values.setflags(write=False)
+        pnls.setflags(write=False)
+        
+        soa = _HoldingsSoA(
+            tradingsymbol=np.asarray([h.get('tradingsymbol') for h in holdings], dtype=object),
+            sector=np.asarray([h.get('sector', 'Unknown') for h in holdings], dtype=object),
+            market_value=market_values,
+            pnl=pnls
+        )
+        self._soa_cache = (holdings, soa)
+        return soa
+    
+    def _market_values(self, holdings: List[Dict[str, Any]]) -> np.ndarray:
+        """Market value of every holding as a float64 array, aligned with the holdings."""
+        return self._to_soa(holdings).market_value
+    
+    def _vectors(self, holdings: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                                  np.ndarray, np.ndarray]:
+        """
+        Per-holding numeric columns as arrays aligned with the holdings.
+        
+        Money columns stay float64; the volatility and VaR estimates are
+        dimensionless approximations and are kept as float32.
+        
+        Returns:
+            Tuple of (market values, P&L, volatilities, 95% VaR, 99% VaR).
+        """
+        n = len(holdings)
+        soa = self._to_soa(holdings)
+        market_values, pnls = soa.market_value, soa.pnl
+        volatilities = np.fromiter(
+            (self._estimate_stock_volatility(h) for h in holdings), dtype=np.float32, count=n
+        )
+        var_95 = volatilities * np.float32(_norm_ppf(0.05))
+        var_99 = volatilities * np.float32(_norm_ppf(0.01))
+        return market_values, pnls, volatilities, var_95, var_99
+    
+    def _compute_all(self, holdings: List[Dict[str, Any]]) -> _RiskInputs:
+        """
+        Gather the inputs of every risk helper from the holdings' arrays.
+        
+        Args:
+            holdings: List of portfolio holdings.
+            
+        Returns:
+            _RiskInputs with market values and P&L arrays, their totals, and
+            per-sector value totals and counts.
+        """
+        soa = self._to_soa(holdings)
+        
+        return _RiskInputs(
+            market_values=soa.market_value,
+            pnls=soa.pnl,
+            total_value=float(soa.market_value.sum()),
+            total_pnl=float(soa.pnl.sum()),
+            sector_data=self._aggregate_sectors(holdings, soa.market_value)
+        )
     
     def analyze_portfolio_risk(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -50,22 +288,37 @@ class RiskAnalyzer:
             portfolio_data: Dictionary containing portfolio holdings and data.
             
         Returns:
-            Dictionary containing comprehensive risk analysis.
+            Dictionary containing comprehensive risk analysis, or an 'error' entry
+            when there are no holdings or their total market value is not positive.
         """
         holdings = portfolio_data.get('holdings', [])
         
         if not holdings:
             return {'error': 'No holdings data available'}
         
+        return self._memoized(self._risk_cache, holdings, datetime.now().date())
+    
+    def _analyze_portfolio_risk_impl(self, key: _HoldingsKey, as_of: Any = None) -> Dict[str, Any]:
+        """Uncached body of analyze_portfolio_risk for non-empty holdings; as_of is a cache key only."""
+        holdings = key.holdings
+        
+        # One pass over the holdings feeds every metric below
+        inputs = self._compute_all(holdings)
+        
+        # Every metric below is a share of the total; they assume it is positive
+        if inputs.total_value <= 0:
+            return {'error': 'Holdings have no market value'}
+        
         # Calculate basic risk metrics
-        concentration_risk = self._calculate_concentration_risk(holdings)
-        sector_risk = self._calculate_sector_risk(holdings)
+        concentration_risk = self._concentration_from(inputs.market_values, inputs.total_value)
+        sector_risk = self._sector_from(inputs.sector_data)
         correlation_risk = self._calculate_correlation_risk(holdings)
-        volatility_analysis = self._calculate_volatility_analysis(holdings)
+        volatility_analysis = self._volatility_from(inputs.market_values, inputs.total_value)
         
         # Calculate portfolio-level risk metrics
-        total_value = sum(self._calculate_market_value(holding) for holding in holdings)
-        total_pnl = sum(float(holding['pnl']) for holding in holdings)
+        total_value = inputs.total_value
+        total_pnl = inputs.total_pnl
+        portfolio_volatility = self._calculate_portfolio_volatility(holdings)
         
         risk_metrics = {
             'concentration_risk': concentration_risk,
@@ -74,12 +327,12 @@ class RiskAnalyzer:
             'volatility_analysis': volatility_analysis,
             'total_portfolio_value': total_value,
             'total_pnl': total_pnl,
-            'portfolio_volatility': self._calculate_portfolio_volatility(holdings),
-            'var_95': self._calculate_portfolio_var(holdings, 0.05),
-            'var_99': self._calculate_portfolio_var(holdings, 0.01),
+            'portfolio_volatility': portfolio_volatility,
+            'var_95': self._calculate_portfolio_var(portfolio_volatility, 0.05),
+            'var_99': self._calculate_portfolio_var(portfolio_volatility, 0.01),
             'max_drawdown_risk': self._calculate_max_drawdown_risk(holdings),
-            'diversification_score': self._calculate_diversification_score(holdings),
-            'risk_score': self._calculate_overall_risk_score(holdings)
+            'diversification_score': self._calculate_diversification_score(holdings, inputs.market_values),
+            'risk_score': self._calculate_overall_risk_score(concentration_risk, sector_risk, volatility_analysis)
         }
         
         return risk_metrics
@@ -92,25 +345,35 @@ class RiskAnalyzer:
             holdings: List of portfolio holdings.
             
         Returns:
-            Dictionary containing diversification analysis.
+            Dictionary containing diversification analysis, or an 'error' entry
+            when there are no holdings or their total market value is not positive.
         """
         if not holdings:
             return {'error': 'No holdings data available'}
         
+        return self._memoized(self._diversification_cache, holdings)
+    
+    def _analyze_diversification_impl(self, key: _HoldingsKey) -> Dict[str, Any]:
+        """Uncached body of analyze_diversification for non-empty holdings."""
+        holdings = key.holdings
+        market_values = self._market_values(holdings)
+        if market_values.sum() <= 0:
+            return {'error': 'Holdings have no market value'}
+        
         # Sector diversification
-        sector_diversification = self._analyze_sector_diversification(holdings)
+        sector_diversification = self._analyze_sector_diversification(holdings, market_values)
         
         # Stock concentration
-        stock_concentration = self._analyze_stock_concentration(holdings)
+        stock_concentration = self._analyze_stock_concentration(holdings, market_values)
         
         # Market cap diversification
         market_cap_diversification = self._analyze_market_cap_diversification(holdings)
         
-        # Herfindahl-Hirschman Index
-        hhi = self._calculate_hhi(holdings)
+        # Herfindahl-Hirschman Index, shared by the effective count and recommendations
+        hhi = self._hhi(market_values)
         
         # Effective number of stocks
-        effective_stocks = self._calculate_effective_stocks(holdings)
+        effective_stocks = self._calculate_effective_stocks(holdings, market_values, hhi)
         
         return {
             'sector_diversification': sector_diversification,
@@ -118,7 +381,9 @@ class RiskAnalyzer:
             'market_cap_diversification': market_cap_diversification,
             'herfindahl_hirschman_index': hhi,
             'effective_number_of_stocks': effective_stocks,
-            'diversification_recommendations': self._generate_diversification_recommendations(holdings)
+            'diversification_recommendations': self._generate_diversification_recommendations(
+                holdings, market_values, hhi
+            )
         }
     
     def calculate_risk_metrics(self, holdings: List[Dict[str, Any]]) -> Dict[str, float]:
@@ -129,60 +394,60 @@ class RiskAnalyzer:
             holdings: List of portfolio holdings.
             
         Returns:
-            Dictionary containing risk metrics.
+            Dictionary containing risk metrics, or an 'error' entry
+            when there are no holdings or their total market value is not positive.
         """
         if not holdings:
             return {'error': 'No holdings data available'}
         
+        return self._memoized(self._metrics_cache, holdings, datetime.now().date())
+    
+    def _calculate_risk_metrics_impl(self, key: _HoldingsKey, as_of: Any = None) -> Dict[str, Any]:
+        """Uncached body of calculate_risk_metrics for non-empty holdings; as_of is a cache key only."""
+        holdings = key.holdings
+        market_values, pnls, volatilities, var_95, var_99 = self._vectors(holdings)
+        symbols = self._to_soa(holdings).tradingsymbol
+        total_value, portfolio_volatility, hhi = _portfolio_kernel(market_values, volatilities)
+        if total_value <= 0:
+            return {'error': 'Holdings have no market value'}
+        weights = market_values / total_value
+        
+        # Parametric VaR over the return correlations, perfect correlation where there is no history
+        correlation = self._holding_correlation(symbols)
+        portfolio_var_95 = self._portfolio_var_param(weights, volatilities, correlation, _norm_ppf(0.05))
+        portfolio_var_99 = self._portfolio_var_param(weights, volatilities, correlation, _norm_ppf(0.01))
+        pnl_percentages = np.divide(pnls * 100, market_values,
+                                    out=np.zeros_like(pnls), where=market_values > 0)
+        
         # Calculate individual stock risk metrics
-        stock_risks = []
-        for holding in holdings:
-            market_value = self._calculate_market_value(holding)
-            pnl = float(holding['pnl'])
-            
-            # Calculate risk metrics for each stock
-            stock_risk = {
-                'symbol': holding['tradingsymbol'],
+        stock_risks = [
+            {
+                'symbol': symbol,
                 'market_value': market_value,
                 'pnl': pnl,
-                'pnl_percentage': (pnl / market_value * 100) if market_value > 0 else 0,
-                'weight': market_value / sum(self._calculate_market_value(h) for h in holdings),
-                'volatility': self._estimate_stock_volatility(holding),
-                'var_95': self._estimate_stock_var(holding, 0.05),
-                'var_99': self._estimate_stock_var(holding, 0.01)
+                'pnl_percentage': pnl_percentage,
+                'weight': weight,
+                'volatility': volatility,
+                'var_95': stock_var_95,
+                'var_99': stock_var_99
             }
-            stock_risks.append(stock_risk)
-        
-        # Calculate portfolio-level metrics
-        total_value = sum(self._calculate_market_value(h) for h in holdings)
-        total_pnl = sum(float(h['pnl']) for h in holdings)
-        
-        # Portfolio volatility (weighted average)
-        portfolio_volatility = sum(
-            stock_risk['weight'] * stock_risk['volatility'] 
-            for stock_risk in stock_risks
-        )
-        
-        # Portfolio VaR
-        portfolio_var_95 = sum(
-            stock_risk['weight'] * stock_risk['var_95'] 
-            for stock_risk in stock_risks
-        )
+            for symbol, market_value, pnl, pnl_percentage, weight, volatility, stock_var_95, stock_var_99
+            in zip(symbols.tolist(), market_values.tolist(), pnls.tolist(), pnl_percentages.tolist(),
+                   weights.tolist(), volatilities.tolist(), var_95.tolist(), var_99.tolist())
+        ]
         
-        portfolio_var_99 = sum(
-            stock_risk['weight'] * stock_risk['var_99'] 
-            for stock_risk in stock_risks
-        )
+        # Calculate portfolio-level metrics; volatility is the value-weighted average
+        total_pnl = float(pnls.sum())
         
         return {
-            'total_portfolio_value': total_value,
+            'total_portfolio_value': float(total_value),
             'total_pnl': total_pnl,
-            'portfolio_volatility': portfolio_volatility,
-            'portfolio_var_95': portfolio_var_95,
-            'portfolio_var_99': portfolio_var_99,
+            'portfolio_volatility': float(portfolio_volatility),
+            'portfolio_var_95': float(portfolio_var_95),
+            'portfolio_var_99': float(portfolio_var_99),
             'stock_risks': stock_risks,
-            'risk_concentration': self._calculate_risk_concentration(stock_risks),
-            'tail_risk': self._calculate_tail_risk(stock_risks)
+            'risk_concentration': self._calculate_risk_concentration(portfolio_volatility, hhi),
+            'tail_risk': self._calculate_tail_risk(portfolio_var_99)
         }
     
     def generate_risk_report(self, portfolio_data: Dict[str, Any], 
@@ -206,58 +471,37 @@ class RiskAnalyzer:
         diversification_analysis = self.analyze_diversification(portfolio_data.get('holdings', []))
         risk_metrics = self.calculate_risk_metrics(portfolio_data.get('holdings', []))
         
-        # Generate report
-        report = f"""
-ZerodhaWise Risk Analysis Report
-Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-{'='*50}
-
-PORTFOLIO RISK OVERVIEW:
-{'='*30}
-"""
+        # Generate report; sections are collected and joined once at the end
+        parts = [self._REPORT_HEADER_TEMPLATE.format(
+            generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )]
         
         if 'error' not in risk_analysis:
-            report += f"""
-Total Portfolio Value: ₹{risk_analysis['total_portfolio_value']:,.2f}
-Total P&L: ₹{risk_analysis['total_pnl']:,.2f}
-Portfolio Volatility: {risk_analysis['portfolio_volatility']:.2%}
-95% Value at Risk: {risk_analysis['var_95']:.2%}
-99% Value at Risk: {risk_analysis['var_99']:.2%}
-Risk Score: {risk_analysis['risk_score']:.2f}/10
-Diversification Score: {risk_analysis['diversification_score']:.2f}/10
-"""
+            parts.append(self._RISK_OVERVIEW_TEMPLATE.format_map(risk_analysis))
         else:
-            report += f"Error: {risk_analysis['error']}\n"
+            parts.append(self._ERROR_TEMPLATE.format_map(risk_analysis))
         
-        report += f"""
-DIVERSIFICATION ANALYSIS:
-{'='*30}
-"""
+        parts.append(self._DIVERSIFICATION_HEADER)
         
         if 'error' not in diversification_analysis:
-            report += f"""
-Herfindahl-Hirschman Index: {diversification_analysis['herfindahl_hirschman_index']:.3f}
-Effective Number of Stocks: {diversification_analysis['effective_number_of_stocks']:.1f}
-"""
+            parts.append(self._DIVERSIFICATION_TEMPLATE.format_map(diversification_analysis))
             
             # Add sector diversification
             if 'sector_diversification' in diversification_analysis:
                 sectors = diversification_analysis['sector_diversification']
-                report += f"\nSector Diversification:\n"
-                for sector, data in sectors.items():
-                    report += f"- {sector}: {data['percentage']:.1f}% ({data['count']} stocks)\n"
+                parts.append("\nSector Diversification:\n")
+                parts.extend(
+                    f"- {sector}: {data['percentage']:.1f}% ({data['count']} stocks)\n"
+                    for sector, data in sectors.items()
+                )
         else:
-            report += f"Error: {diversification_analysis['error']}\n"
+            parts.append(self._ERROR_TEMPLATE.format_map(diversification_analysis))
         
-        report += f"""
-RISK RECOMMENDATIONS:
-{'='*30}
-"""
+        parts.append(self._RECOMMENDATIONS_HEADER)
         
         if 'diversification_recommendations' in diversification_analysis:
             recommendations = diversification_analysis['diversification_recommendations']
-            for rec in recommendations:
-                report += f"- {rec}\n"
+            parts.extend(f"- {rec}\n" for rec in recommendations)
         
         # Save report
         import os
@@ -265,26 +509,37 @@ RISK RECOMMENDATIONS:
         filepath = os.path.join('reports', filename)
         
         with open(filepath, 'w') as f:
-            f.write(report)
+            f.write("".join(parts))
         
         self.logger.info(f"Risk report exported to {filepath}")
         return filepath
     
-    def _calculate_concentration_risk(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_concentration_risk(self, holdings: List[Dict[str, Any]],
+                                      market_values: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Calculate concentration risk metrics."""
         if not holdings:
             return {}
         
-        total_value = sum(self._calculate_market_value(h) for h in holdings)
+        if market_values is None:
+            market_values = self._market_values(holdings)
         
+        return self._concentration_from(market_values, float(market_values.sum()))
+    
+    @staticmethod
+    def _top_values(market_values: np.ndarray, k: int) -> np.ndarray:
+        """The k largest market values, largest first, via an O(N) partition."""
+        k = min(k, market_values.size)
+        return np.sort(np.partition(market_values, market_values.size - k)[-k:])[::-1]
+    
+    def _concentration_from(self, market_values: np.ndarray, total_value: float) -> Dict[str, Any]:
+        """Concentration risk metrics from the holdings' market values and their positive total."""
         # Top 5 concentration
-        sorted_holdings = sorted(holdings, key=lambda x: self._calculate_market_value(x), reverse=True)
-        top_5_value = sum(self._calculate_market_value(h) for h in sorted_holdings[:5])
-        top_5_concentration = (top_5_value / total_value * 100) if total_value > 0 else 0
+        top_5_value = float(self._top_values(market_values, 5).sum())
+        top_5_concentration = top_5_value / total_value * 100
         
         # Single stock concentration
-        max_single_stock = max(self._calculate_market_value(h) for h in holdings)
-        max_single_concentration = (max_single_stock / total_value * 100) if total_value > 0 else 0
+        max_single_stock = float(market_values.max())
+        max_single_concentration = max_single_stock / total_value * 100
         
         return {
             'top_5_concentration': top_5_concentration,
@@ -292,27 +547,46 @@ RISK RECOMMENDATIONS:
             'concentration_risk_level': self._assess_concentration_risk(top_5_concentration)
         }
     
-    def _calculate_sector_risk(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_sector_risk(self, holdings: List[Dict[str, Any]],
+                               market_values: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Calculate sector-based risk metrics."""
-        sector_data = {}
+        return self._sector_from(self._aggregate_sectors(holdings, market_values))
+    
+    def _aggregate_sectors(self, holdings: List[Dict[str, Any]],
+                           market_values: Optional[np.ndarray] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Total market value and holding count per sector, in first-seen sector order.
         
-        for holding in holdings:
-            sector = holding.get('sector', 'Unknown')
-            market_value = self._calculate_market_value(holding)
-            
-            if sector not in sector_data:
-                sector_data[sector] = {'total_value': 0, 'count': 0}
+        Args:
+            holdings: List of portfolio holdings.
+            market_values: Precomputed market values aligned with holdings.
             
-            sector_data[sector]['total_value'] += market_value
-            sector_data[sector]['count'] += 1
+        Returns:
+            Dictionary mapping sector to {'total_value', 'count'}.
+        """
+        if market_values is None:
+            market_values = self._market_values(holdings)
+        totals = defaultdict(lambda: [0.0, 0])
         
+        for sector, market_value in zip(self._to_soa(holdings).sector.tolist(), market_values.tolist()):
+            entry = totals[sector]
+            entry[0] += market_value
+            entry[1] += 1
+        
+        return {
+            sector: {'total_value': total, 'count': count}
+            for sector, (total, count) in totals.items()
+        }
+    
+    def _sector_from(self, sector_data: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Sector risk metrics from per-sector 'total_value' and 'count' totals."""
         total_value = sum(data['total_value'] for data in sector_data.values())
         
         # Calculate sector concentrations
         sector_concentrations = {}
         for sector, data in sector_data.items():
             sector_concentrations[sector] = {
-                'percentage': (data['total_value'] / total_value * 100) if total_value > 0 else 0,
+                'percentage': data['total_value'] / total_value * 100,
                 'count': data['count'],
                 'total_value': data['total_value']
             }
@@ -328,30 +602,196 @@ RISK RECOMMENDATIONS:
             'sector_risk_level': self._assess_sector_risk(max_sector_concentration)
         }
     
-    def _calculate_correlation_risk(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate correlation-based risk metrics."""
-        # This is a simplified correlation analysis
-        # In a real implementation, you would need historical price data
+    def _calculate_correlation_risk(self, holdings: List[Dict[str, Any]],
+                                    days: int = 90) -> Dict[str, Any]:
+        """
+        Calculate correlation-based risk metrics from stored market data.
+        
+        Args:
+            holdings: List of portfolio holdings.
+            days: Number of days of price history to correlate.
+            
+        Returns:
+            Dictionary with the mean absolute pairwise return correlation and its
+            risk level, or a generic recommendation when there is too little history.
+        """
+        analyzed, correlation = self._symbol_correlation(
+            (h.get('tradingsymbol') for h in holdings), days
+        )
+        n = len(analyzed)
+        if n < 2:
+            return {
+                'correlation_risk_level': 'Medium',  # No usable price history
+                'recommendation': 'Consider historical correlation analysis for better risk assessment'
+            }
+        
+        # Mean of |C_ij| over the strict upper triangle, i.e. every distinct pair once
+        mean_abs_correlation = float(np.abs(np.triu(correlation, 1)).sum() / (n * (n - 1) / 2))
+        
+        if mean_abs_correlation > 0.7:
+            level = 'High'
+            recommendation = 'Holdings move closely together; add assets with lower correlation'
+        elif mean_abs_correlation > 0.4:
+            level = 'Medium'
+            recommendation = 'Moderate co-movement; monitor correlation between large positions'
+        else:
+            level = 'Low'
+            recommendation = 'Holdings show low correlation'
+        
+        return {
+            'average_correlation': mean_abs_correlation,
+            'symbols_analyzed': n,
+            'factor_risk': self._factor_risk(correlation),
+            'correlation_risk_level': level,
+            'recommendation': recommendation
+        }
+    
+    @staticmethod
+    def _factor_risk(covariance: np.ndarray, n_factors: int = 3) -> Dict[str, Any]:
+        """
+        Principal risk factors from a symmetric covariance (or correlation) matrix.
+        
+        Uses np.linalg.eigh, which exploits symmetry and returns real eigenvalues
+        in ascending order, instead of a general eigensolver or a PCA fit.
+        
+        Args:
+            covariance: N x N symmetric covariance or correlation matrix of returns.
+            n_factors: Number of leading factors to report.
+            
+        Returns:
+            Dictionary with the variance share of the leading factors and
+            the loadings of the first factor.
+        """
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        eigenvalues = np.clip(eigenvalues[::-1], 0, None)
+        eigenvectors = eigenvectors[:, ::-1]
+        
+        total_variance = eigenvalues.sum()
+        if total_variance <= 0:
+            return {}
+        explained = eigenvalues[:n_factors] / total_variance
         
         return {
-            'correlation_risk_level': 'Medium',  # Placeholder
-            'recommendation': 'Consider historical correlation analysis for better risk assessment'
+            'explained_variance_ratio': explained.tolist(),
+            'first_factor_share': float(explained[0]),
+            'first_factor_loadings': eigenvectors[:, 0].tolist()
         }
     
-    def _calculate_volatility_analysis(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _symbol_correlation(self, symbols: Iterable[Optional[str]],
+                            days: int = 90) -> Tuple[Tuple[str, ...], np.ndarray]:
+        """Cached correlation matrix for the distinct, non-empty symbols given."""
+        key = tuple(sorted({symbol for symbol in symbols if symbol}))
+        # The date is part of the key so cached matrices don't outlive the day's data
+        return self._correlation_matrix(key, days, datetime.now().date())
+    
+    def _holding_correlation(self, symbols: np.ndarray, days: int = 90) -> Optional[np.ndarray]:
+        """
+        Return correlation matrix aligned with the holdings.
+        
+        Pairs without price history are assumed perfectly correlated, so
+        missing data never makes VaR look smaller than the weighted sum of
+        the holdings' own VaRs.
+        
+        Args:
+            symbols: Trading symbol of each holding.
+            days: Number of days of price history to correlate.
+            
+        Returns:
+            N x N correlation matrix, or None when no pair has history (perfect correlation).
+        """
+        analyzed, correlation = self._symbol_correlation(symbols.tolist(), days)
+        if not analyzed:
+            return None
+        
+        position = {symbol: i for i, symbol in enumerate(analyzed)}
+        index = np.fromiter((position.get(symbol, -1) for symbol in symbols.tolist()),
+                            dtype=np.intp, count=len(symbols))
+        known = np.flatnonzero(index >= 0)
+        
+        full = np.ones((len(symbols), len(symbols)))
+        full[np.ix_(known, known)] = correlation[np.ix_(index[known], index[known])]
+        return full
+    
+    @staticmethod
+    def _portfolio_var_param(weights: np.ndarray, volatilities: np.ndarray,
+                             correlation: Optional[np.ndarray], quantile: float) -> float:
+        """
+        Parametric portfolio VaR, quantile * sqrt(w' Σ w) with Σ = diag(σ) C diag(σ).
+        
+        Args:
+            weights: Portfolio weights.
+            volatilities: Volatility of each holding.
+            correlation: Correlation matrix aligned with the weights; None means
+                perfect correlation, i.e. the weighted sum of the holdings' VaRs.
+            quantile: Standard normal quantile for the confidence level.
+            
+        Returns:
+            Portfolio VaR as a fraction of portfolio value.
+        """
+        # w' Σ w == x' C x with x = w * σ, so Σ itself is never materialized
+        scaled = weights * volatilities
+        if correlation is None:
+            variance = scaled.sum() ** 2
+        else:
+            variance = scaled @ correlation @ scaled
+        return float(quantile * np.sqrt(variance))
+    
+    def _correlation_matrix_impl(self, symbols: Tuple[str, ...], days: int,
+                                 as_of: Any = None) -> Tuple[Tuple[str, ...], np.ndarray]:
+        """
+        Pearson correlation matrix of daily returns for the given symbols.
+        
+        Args:
+            symbols: Sorted tuple of stock symbols.
+            days: Number of days of price history to use.
+            as_of: Cache key component only; the data is always read up to now.
+            
+        Returns:
+            Tuple of (symbols with usable history, read-only N x N correlation matrix).
+        """
+        if len(symbols) < 2 or not self.data_manager.has_market_data():
+            return (), np.empty((0, 0))
+        
+        prices = {}
+        for symbol in symbols:
+            market_data = self.data_manager.get_market_data(symbol, days)
+            column = next(
+                (c for c in ('close', 'last_price', 'close_price') if c in market_data.columns), None
+            )
+            if column is not None:
+                prices[symbol] = pd.to_numeric(market_data[column], errors='coerce')
+        
+        if len(prices) < 2:
+            return (), np.empty((0, 0))
+        
+        # Align on timestamp into a T x N returns matrix and correlate all pairs at once
+        returns = pd.concat(prices, axis=1).sort_index().pct_change().dropna()
+        returns = returns.loc[:, returns.std() > 0]
+        if len(returns) < 3 or returns.shape[1] < 2:
+            return (), np.empty((0, 0))
+        
+        correlation = np.corrcoef(returns.to_numpy(), rowvar=False)
+        correlation.setflags(write=False)
+        return tuple(returns.columns), correlation
+    
+    def _calculate_volatility_analysis(self, holdings: List[Dict[str, Any]],
+                                       market_values: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Calculate volatility-based risk metrics."""
         if not holdings:
             return {}
         
-        # Calculate weighted average volatility
-        total_value = sum(self._calculate_market_value(h) for h in holdings)
-        weighted_volatility = 0
+        if market_values is None:
+            market_values = self._market_values(holdings)
         
-        for holding in holdings:
-            weight = self._calculate_market_value(holding) / total_value if total_value > 0 else 0
-            # Estimate volatility (in real implementation, use historical data)
-            estimated_volatility = 0.25  # Placeholder - 25% annual volatility
-            weighted_volatility += weight * estimated_volatility
+        return self._volatility_from(market_values, float(market_values.sum()))
+    
+    def _volatility_from(self, market_values: np.ndarray, total_value: float) -> Dict[str, Any]:
+        """Volatility risk metrics from the holdings' market values and their positive total."""
+        # Calculate weighted average volatility
+        weights = market_values / total_value
+        # Estimate volatility (in real implementation, use historical data)
+        estimated_volatility = np.full_like(market_values, 0.25)  # Placeholder - 25% annual volatility
+        weighted_volatility = float(weights @ estimated_volatility)
         
         return {
             'portfolio_volatility': weighted_volatility,
@@ -363,26 +803,25 @@ RISK RECOMMENDATIONS:
         # Simplified calculation - in real implementation, use historical data
         return 0.20  # Placeholder - 20% annual volatility
     
-    def _calculate_portfolio_var(self, holdings: List[Dict[str, Any]], confidence_level: float) -> float:
-        """Calculate portfolio Value at Risk."""
-        # Simplified VaR calculation
-        portfolio_volatility = self._calculate_portfolio_volatility(holdings)
-        var_factor = stats.norm.ppf(confidence_level)
-        return portfolio_volatility * var_factor
+    @staticmethod
+    def _calculate_portfolio_var(portfolio_volatility: float, confidence_level: float) -> float:
+        """Calculate parametric portfolio Value at Risk from an already computed volatility."""
+        return portfolio_volatility * _norm_ppf(confidence_level)
     
     def _calculate_max_drawdown_risk(self, holdings: List[Dict[str, Any]]) -> float:
         """Calculate maximum drawdown risk."""
         # Simplified calculation
         return 0.15  # Placeholder - 15% max drawdown
     
-    def _calculate_diversification_score(self, holdings: List[Dict[str, Any]]) -> float:
-        """Calculate diversification score (0-10)."""
+    def _calculate_diversification_score(self, holdings: List[Dict[str, Any]],
+                                         market_values: Optional[np.ndarray] = None,
+                                         hhi: Optional[float] = None) -> float:
+        """Calculate diversification score (0-10), reusing ``hhi`` when already known."""
         if not holdings:
             return 0.0
         
-        # Calculate HHI
-        total_value = sum(self._calculate_market_value(h) for h in holdings)
-        hhi = sum((self._calculate_market_value(h) / total_value) ** 2 for h in holdings) if total_value > 0 else 1
+        if hhi is None:
+            hhi = self._calculate_hhi(holdings, market_values)
         
         # Convert HHI to diversification score (0-10)
         # Lower HHI = higher diversification
@@ -390,74 +829,49 @@ RISK RECOMMENDATIONS:
         
         return diversification_score
     
-    def _calculate_overall_risk_score(self, holdings: List[Dict[str, Any]]) -> float:
-        """Calculate overall risk score (0-10)."""
-        if not holdings:
-            return 10.0  # Maximum risk if no holdings
-        
-        # Combine various risk factors
-        concentration_risk = self._calculate_concentration_risk(holdings)
-        sector_risk = self._calculate_sector_risk(holdings)
-        volatility_risk = self._calculate_volatility_analysis(holdings)
-        
-        # Calculate weighted risk score
-        risk_score = 0
-        weights = {'concentration': 0.3, 'sector': 0.3, 'volatility': 0.4}
-        
-        # Concentration risk
-        if 'top_5_concentration' in concentration_risk:
-            concentration_score = min(10, concentration_risk['top_5_concentration'] / 10)
-            risk_score += weights['concentration'] * concentration_score
-        
-        # Sector risk
-        if 'max_sector_concentration' in sector_risk:
-            sector_score = min(10, sector_risk['max_sector_concentration'] / 10)
-            risk_score += weights['sector'] * sector_score
-        
-        # Volatility risk
-        if 'portfolio_volatility' in volatility_risk:
-            volatility_score = min(10, volatility_risk['portfolio_volatility'] * 40)  # Scale to 0-10
-            risk_score += weights['volatility'] * volatility_score
-        
-        return min(10, risk_score)
+    def _calculate_overall_risk_score(self, concentration_risk: Dict[str, Any],
+                                      sector_risk: Dict[str, Any],
+                                      volatility_risk: Dict[str, Any]) -> float:
+        """Calculate overall risk score (0-10) from already computed risk components."""
+        # Concentration and sector percentages / 10, volatility * 40, each scaled to 0-10;
+        # a missing component is NaN and contributes nothing
+        scores = np.array([
+            concentration_risk.get('top_5_concentration', np.nan) / 10,
+            sector_risk.get('max_sector_concentration', np.nan) / 10,
+            volatility_risk.get('portfolio_volatility', np.nan) * 40
+        ])
+        
+        # Weights sum to 1, so the weighted score of clipped components stays within 0-10
+        return float(np.clip(np.nan_to_num(scores), 0, 10) @ self._RISK_SCORE_WEIGHTS)
     
-    def _analyze_sector_diversification(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_sector_diversification(self, holdings: List[Dict[str, Any]],
+                                        market_values: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Analyze sector diversification."""
-        sector_data = {}
-        
-        for holding in holdings:
-            sector = holding.get('sector', 'Unknown')
-            market_value = self._calculate_market_value(holding)
-            
-            if sector not in sector_data:
-                sector_data[sector] = {'total_value': 0, 'count': 0}
-            
-            sector_data[sector]['total_value'] += market_value
-            sector_data[sector]['count'] += 1
-        
+        sector_data = self._aggregate_sectors(holdings, market_values)
         total_value = sum(data['total_value'] for data in sector_data.values())
         
         for sector in sector_data:
-            sector_data[sector]['percentage'] = (
-                sector_data[sector]['total_value'] / total_value * 100
-            ) if total_value > 0 else 0
+            sector_data[sector]['percentage'] = sector_data[sector]['total_value'] / total_value * 100
         
         return sector_data
     
-    def _analyze_stock_concentration(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_stock_concentration(self, holdings: List[Dict[str, Any]],
+                                     market_values: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Analyze stock concentration."""
         if not holdings:
             return {}
         
-        total_value = sum(self._calculate_market_value(h) for h in holdings)
+        if market_values is None:
+            market_values = self._market_values(holdings)
+        total_value = float(market_values.sum())
         
         # Calculate concentration metrics
-        sorted_holdings = sorted(holdings, key=lambda x: self._calculate_market_value(x), reverse=True)
+        sorted_values = self._top_values(market_values, 5).tolist()
         
         concentration_metrics = {
-            'top_1_concentration': (self._calculate_market_value(sorted_holdings[0]) / total_value * 100) if total_value > 0 else 0,
-            'top_3_concentration': (sum(self._calculate_market_value(h) for h in sorted_holdings[:3]) / total_value * 100) if total_value > 0 else 0,
-            'top_5_concentration': (sum(self._calculate_market_value(h) for h in sorted_holdings[:5]) / total_value * 100) if total_value > 0 else 0,
+            'top_1_concentration': sorted_values[0] / total_value * 100,
+            'top_3_concentration': sum(sorted_values[:3]) / total_value * 100,
+            'top_5_concentration': sum(sorted_values[:5]) / total_value * 100,
             'number_of_stocks': len(holdings)
         }
         
@@ -472,36 +886,51 @@ RISK RECOMMENDATIONS:
             'small_cap_percentage': 10.0   # Placeholder
         }
     
-    def _calculate_hhi(self, holdings: List[Dict[str, Any]]) -> float:
-        """Calculate Herfindahl-Hirschman Index."""
-        if not holdings:
-            return 1.0  # Maximum concentration
-        
-        total_value = sum(self._calculate_market_value(h) for h in holdings)
+    @staticmethod
+    def _hhi(market_values: np.ndarray) -> float:
+        """Herfindahl-Hirschman Index of the value weights; 1.0 (maximum) for a zero total."""
+        total_value = market_values.sum()
         
         if total_value == 0:
             return 1.0
         
-        hhi = sum((self._calculate_market_value(h) / total_value) ** 2 for h in holdings)
-        return hhi
+        weights = np.ascontiguousarray(market_values / total_value)
+        return float(_hhi_kernel(weights))
+    
+    def _calculate_hhi(self, holdings: List[Dict[str, Any]],
+                       market_values: Optional[np.ndarray] = None) -> float:
+        """Calculate Herfindahl-Hirschman Index."""
+        if not holdings:
+            return 1.0  # Maximum concentration
+        
+        if market_values is None:
+            market_values = self._market_values(holdings)
+        return self._hhi(market_values)
     
-    def _calculate_effective_stocks(self, holdings: List[Dict[str, Any]]) -> float:
-        """Calculate effective number of stocks."""
-        hhi = self._calculate_hhi(holdings)
+    def _calculate_effective_stocks(self, holdings: List[Dict[str, Any]],
+                                    market_values: Optional[np.ndarray] = None,
+                                    hhi: Optional[float] = None) -> float:
+        """Calculate effective number of stocks, 1 / HHI, reusing ``hhi`` when already known."""
+        if hhi is None:
+            hhi = self._calculate_hhi(holdings, market_values)
         return 1 / hhi if hhi > 0 else 0
     
-    def _generate_diversification_recommendations(self, holdings: List[Dict[str, Any]]) -> List[str]:
+    def _generate_diversification_recommendations(self, holdings: List[Dict[str, Any]],
+                                                  market_values: Optional[np.ndarray] = None,
+                                                  hhi: Optional[float] = None) -> List[str]:
         """Generate diversification recommendations."""
+        if market_values is None:
+            market_values = self._market_values(holdings)
         recommendations = []
         
         # Analyze concentration
-        concentration_risk = self._calculate_concentration_risk(holdings)
+        concentration_risk = self._calculate_concentration_risk(holdings, market_values)
         if 'top_5_concentration' in concentration_risk:
             if concentration_risk['top_5_concentration'] > 70:
                 recommendations.append("Consider reducing concentration in top 5 holdings")
         
         # Analyze sector concentration
-        sector_risk = self._calculate_sector_risk(holdings)
+        sector_risk = self._calculate_sector_risk(holdings, market_values)
         if 'max_sector_concentration' in sector_risk:
             if sector_risk['max_sector_concentration'] > 40:
                 recommendations.append("Consider diversifying across more sectors")
@@ -511,7 +940,8 @@ RISK RECOMMENDATIONS:
             recommendations.append("Consider increasing the number of stocks for better diversification")
         
         # Analyze HHI
-        hhi = self._calculate_hhi(holdings)
+        if hhi is None:
+            hhi = self._calculate_hhi(holdings, market_values)
         if hhi > 0.25:  # High concentration
             recommendations.append("Portfolio is highly concentrated - consider more diversification")
         
@@ -555,29 +985,19 @@ RISK RECOMMENDATIONS:
     def _estimate_stock_var(self, holding: Dict[str, Any], confidence_level: float) -> float:
         """Estimate stock Value at Risk."""
         volatility = self._estimate_stock_volatility(holding)
-        var_factor = stats.norm.ppf(confidence_level)
+        var_factor = _norm_ppf(confidence_level)
         return volatility * var_factor
     
-    def _calculate_risk_concentration(self, stock_risks: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate risk concentration metrics."""
-        if not stock_risks:
-            return {}
-        
-        # Calculate risk-weighted metrics
-        total_risk = sum(stock_risk['weight'] * stock_risk['volatility'] for stock_risk in stock_risks)
-        
+    def _calculate_risk_concentration(self, total_risk: float, hhi: float) -> Dict[str, Any]:
+        """Calculate risk concentration metrics from the weighted volatility and weight HHI."""
         return {
-            'total_risk': total_risk,
-            'risk_concentration_score': sum(stock_risk['weight'] ** 2 for stock_risk in stock_risks)
+            'total_risk': float(total_risk),
+            'risk_concentration_score': float(hhi)
         }
     
-    def _calculate_tail_risk(self, stock_risks: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate tail risk metrics."""
-        if not stock_risks:
-            return {}
-        
-        # Calculate portfolio tail risk
-        portfolio_var_99 = sum(stock_risk['weight'] * stock_risk['var_99'] for stock_risk in stock_risks)
+    def _calculate_tail_risk(self, portfolio_var_99: float) -> Dict[str, Any]:
+        """Calculate tail risk metrics from the weighted 99% VaR."""
+        portfolio_var_99 = float(portfolio_var_99)
         
         return {
             'portfolio_var_99': portfolio_var_99,
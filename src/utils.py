@@ -5,24 +5,56 @@ This module provides utility functions for configuration loading,
 logging setup, and other common operations.
 """
 
+import atexit
+import copy
+import functools
 import logging
+import logging.handlers
 import os
+import queue
+import pickle
 import yaml
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 import re
 from typing import Dict, Optional
-from bs4 import BeautifulSoup
 import json
 
-import pandas as pd
-import yfinance as yf
 import time
 import logging
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; kernels then run as plain Python
+    def njit(*args, **kwargs):
+        """Fallback for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml; use the pure-Python loader
+    from yaml import SafeLoader as _YamlLoader
+
+# Maps characters not allowed in file names on common filesystems to '_'
+_FILENAME_TRANS = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+
+@functools.lru_cache(maxsize=8)
+def _read_config(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parse a YAML configuration file.
+    
+    Cached per (absolute path, modification time, size), so an edited file
+    is parsed again while an unchanged one is not re-read.
+    """
+    with open(config_path, 'rb') as f:
+        return yaml.load(f.read(), Loader=_YamlLoader)
 
 
 def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
@@ -31,16 +63,22 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     
     Args:
         config_path: Path to configuration file. If None, uses default config.
+            An already-loaded configuration dictionary is returned unchanged.
         
     Returns:
         Dictionary containing configuration.
     """
+    if isinstance(config_path, dict):
+        return config_path
+    
     if config_path is None:
         config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.yaml')
-            
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    return config
+    
+    config_path = os.path.abspath(config_path)
+    stat = os.stat(config_path)
+    
+    # Hand out a copy so callers can't mutate the cached document
+    return copy.deepcopy(_read_config(config_path, stat.st_mtime_ns, stat.st_size))
     
     # Default configuration
     # default_config = {
@@ -116,7 +154,7 @@ def setup_logging(name: str, config: Optional[Dict[str, Any]] = None) -> logging
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # Create file handler
     log_file = config.get('logging', {}).get('file', 'logs/zerodhawise.log')
@@ -126,10 +164,18 @@ def setup_logging(name: str, config: Optional[Dict[str, Any]] = None) -> logging
             file_handler = logging.FileHandler(log_file)
             file_handler.setLevel(log_level)
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            handlers.append(file_handler)
         except Exception as e:
             print(f"Warning: Could not setup file logging: {str(e)}")
     
+    # Log calls only enqueue the record; a listener thread does the console and file IO.
+    # Stopping it at exit drains whatever is still queued.
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
     return logger
 
 
@@ -200,6 +246,75 @@ def validate_zerodha_credentials(config: Dict[str, Any]) -> bool:
     return True
 
 
+def disk_cache(cache_path: str, max_age_seconds: Optional[float] = None):
+    """
+    Decorator that persists a zero-argument function's result with pickle.
+    
+    The first call computes the result and writes it to ``cache_path``;
+    later calls (including from new processes) load it from disk instead.
+    
+    Args:
+        cache_path: Path of the pickle file.
+        max_age_seconds: If given, a cache file older than this is ignored
+            and the result is computed and written again.
+        
+    Returns:
+        Decorator wrapping the function.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            if os.path.exists(cache_path) and (
+                max_age_seconds is None
+                or time.time() - os.path.getmtime(cache_path) < max_age_seconds
+            ):
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+            
+            result = func()
+            try:
+                os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+                with open(cache_path, 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except OSError as e:
+                print(f"Warning: Could not write cache file {cache_path}: {str(e)}")
+            return result
+        return wrapper
+    return decorator
+
+
+def ttl_cache(ttl_seconds: float):
+    """
+    Decorator that memoizes a function's result per positional arguments for a limited time.
+    
+    Results older than ``ttl_seconds`` are recomputed on the next call. The
+    wrapper exposes ``cache_clear()`` to drop every stored result.
+    
+    Args:
+        ttl_seconds: How long a result stays valid, in seconds.
+        
+    Returns:
+        Decorator wrapping the function.
+    """
+    def decorator(func):
+        cache = {}
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            entry = cache.get(args)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            
+            result = func(*args)
+            cache[args] = (now + ttl_seconds, result)
+            return result
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
 def create_sample_data() -> Dict[str, Any]:
     """
     Create sample portfolio data for testing.
@@ -303,9 +418,8 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename.
     """
-    import re
     # Remove or replace invalid characters
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    sanitized = filename.translate(_FILENAME_TRANS)
     # Remove leading/trailing spaces and dots
     sanitized = sanitized.strip('. ')
     # Ensure filename is not empty
@@ -367,26 +481,50 @@ def parse_date_range(date_range: str) -> tuple:
         return None, None 
 
 
-def get_sector_details_for_nse_stocks():
-
+@ttl_cache(3600)
+@disk_cache(os.path.join(get_project_root(), '.cache', 'nse_ticker_info.pkl'), max_age_seconds=24 * 3600)
+def _fetch_nse_ticker_info() -> Dict[str, Any]:
     """
-    Fetches a list of all stocks from NSE then uses yfinance to get info on the stock including
-    the sector and market capitalization.
-
-    Returns: None
-        
+    Fetch yfinance info for every NSE symbol in data/sec_list.csv.
+    
+    Calls within an hour of a previous fetch reuse its result in memory, and
+    a pickle under .cache/ lets new processes skip the network for a day.
     """
+    import pandas as pd
+    import yfinance as yf
 
     nse_df = pd.read_csv('data/sec_list.csv', header=0)
 
     list_of_tickers = nse_df['Symbol'].tolist()
 
-    final_dict = {}
-    for ticker in list_of_tickers:
-        stock_info = yf.Ticker(f'{ticker}.NS').info
-        final_dict[ticker] = stock_info
-    with open('data/nse_ticker_info.json','w') as f:
+    # One Tickers object shares a single yfinance session across all symbols (and
+    # keys them upper-cased); info is still one HTTPS request per symbol, so
+    # overlap those on a thread pool
+    tickers = yf.Tickers(' '.join(f'{ticker}.NS' for ticker in list_of_tickers)).tickers
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        infos = executor.map(lambda ticker: tickers[f'{ticker}.NS'.upper()].info, list_of_tickers)
+        return dict(zip(list_of_tickers, infos))
+
+
+def get_sector_details_for_nse_stocks() -> Dict[str, Any]:
+
+    """
+    Fetches a list of all stocks from NSE then uses yfinance to get info on the stock including
+    the sector and market capitalization.
+
+    The result is written to data/nse_ticker_info.json under the project root
+    on every call, including when it comes from the fetch cache, so the file
+    the portfolio sector lookup reads is always present.
+
+    Returns:
+        Dictionary mapping NSE symbol to its yfinance info.
+    """
+    final_dict = _fetch_nse_ticker_info()
+    data_dir = os.path.join(get_project_root(), 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, 'nse_ticker_info.json'), 'w') as f:
         json.dump(final_dict,f)
+    return final_dict
 # def get_sector_and_mcap(ticker_nse,):
 #     with open('data/nse_ticker_info.json', 'r') as f:
 #         ticker_with_details = json.load(f)
@@ -37,6 +37,9 @@ class ChartGenerator:
         self.config = load_config(config_path)
         self.logger = setup_logging(__name__)
         
+        # Cleared figures kept for reuse across chart calls
+        self._fig_pool = []
+        
         # Set style for matplotlib
         plt.style.use('seaborn-v0_8')
         sns.set_palette("husl")
@@ -48,6 +51,24 @@ class ChartGenerator:
         else:
             return float(holding['quantity']) * float(holding['close_price'])
     
+    def _get_fig(self, figsize: Tuple[float, float]):
+        """Take a figure from the pool, or create one if the pool is empty."""
+        if self._fig_pool:
+            fig = self._fig_pool.pop()
+            fig.set_size_inches(figsize)
+            return fig
+        return plt.figure(figsize=figsize)
+    
+    def _release_fig(self, fig):
+        """Clear a figure and return it to the pool."""
+        fig.clear()
+        self._fig_pool.append(fig)
+    
+    def close(self):
+        """Close the pooled figures so pyplot can free them."""
+        while self._fig_pool:
+            plt.close(self._fig_pool.pop())
+    
     def create_portfolio_summary_chart(self, portfolio_data: Dict[str, Any], 
                                      save_path: Optional[str] = None) -> str:
         """
@@ -67,31 +88,34 @@ class ChartGenerator:
                 return ""
             
             # Create subplots
-            fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-            fig.suptitle('Portfolio Summary Dashboard', fontsize=16, fontweight='bold')
-            
-            # 1. Portfolio Composition (Pie Chart)
-            self._create_composition_chart(holdings, axes[0, 0])
-            
-            # 2. P&L Distribution (Bar Chart)
-            self._create_pnl_distribution_chart(holdings, axes[0, 1])
-            
-            # 3. Sector Allocation (Bar Chart)
-            self._create_sector_allocation_chart(holdings, axes[1, 0])
-            
-            # 4. Top Holdings (Horizontal Bar Chart)
-            self._create_top_holdings_chart(holdings, axes[1, 1])
-            
-            plt.tight_layout()
-            
-            # Save chart
-            if save_path is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                save_path = f"reports/portfolio_summary_{timestamp}.png"
-            
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig = self._get_fig((15, 12))
+            try:
+                axes = fig.subplots(2, 2)
+                fig.suptitle('Portfolio Summary Dashboard', fontsize=16, fontweight='bold')
+                
+                # 1. Portfolio Composition (Pie Chart)
+                self._create_composition_chart(holdings, axes[0, 0])
+                
+                # 2. P&L Distribution (Bar Chart)
+                self._create_pnl_distribution_chart(holdings, axes[0, 1])
+                
+                # 3. Sector Allocation (Bar Chart)
+                self._create_sector_allocation_chart(holdings, axes[1, 0])
+                
+                # 4. Top Holdings (Horizontal Bar Chart)
+                self._create_top_holdings_chart(holdings, axes[1, 1])
+                
+                fig.tight_layout()
+                
+                # Save chart
+                if save_path is None:
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    save_path = f"reports/portfolio_summary_{timestamp}.png"
+                
+                os.makedirs(os.path.dirname(save_path), exist_ok=True)
+                fig.savefig(save_path, dpi=300, bbox_inches='tight')
+            finally:
+                self._release_fig(fig)
             
             self.logger.info(f"Portfolio summary chart saved to {save_path}")
             return save_path
@@ -117,25 +141,28 @@ class ChartGenerator:
                 self.logger.warning("No portfolio data available for performance chart")
                 return ""
             
-            fig, axes = plt.subplots(2, 1, figsize=(15, 10))
-            fig.suptitle('Portfolio Performance Analysis', fontsize=16, fontweight='bold')
-            
-            # 1. Portfolio Value Over Time
-            self._create_portfolio_value_chart(portfolio_data, axes[0])
-            
-            # 2. Returns Distribution
-            self._create_returns_distribution_chart(portfolio_data, axes[1])
-            
-            plt.tight_layout()
-            
-            # Save chart
-            if save_path is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                save_path = f"reports/performance_analysis_{timestamp}.png"
-            
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig = self._get_fig((15, 10))
+            try:
+                axes = fig.subplots(2, 1)
+                fig.suptitle('Portfolio Performance Analysis', fontsize=16, fontweight='bold')
+                
+                # 1. Portfolio Value Over Time
+                self._create_portfolio_value_chart(portfolio_data, axes[0])
+                
+                # 2. Returns Distribution
+                self._create_returns_distribution_chart(portfolio_data, axes[1])
+                
+                fig.tight_layout()
+                
+                # Save chart
+                if save_path is None:
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    save_path = f"reports/performance_analysis_{timestamp}.png"
+                
+                os.makedirs(os.path.dirname(save_path), exist_ok=True)
+                fig.savefig(save_path, dpi=300, bbox_inches='tight')
+            finally:
+                self._release_fig(fig)
             
             self.logger.info(f"Performance chart saved to {save_path}")
             return save_path
@@ -157,31 +184,34 @@ class ChartGenerator:
             Path to the saved chart.
         """
         try:
-            fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-            fig.suptitle('Risk Analysis Dashboard', fontsize=16, fontweight='bold')
-            
-            # 1. Risk Score
-            self._create_risk_score_chart(risk_data, axes[0, 0])
-            
-            # 2. Diversification Score
-            self._create_diversification_chart(risk_data, axes[0, 1])
-            
-            # 3. Concentration Risk
-            self._create_concentration_chart(risk_data, axes[1, 0])
-            
-            # 4. Sector Risk
-            self._create_sector_risk_chart(risk_data, axes[1, 1])
-            
-            plt.tight_layout()
-            
-            # Save chart
-            if save_path is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                save_path = f"reports/risk_analysis_{timestamp}.png"
-            
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig = self._get_fig((15, 12))
+            try:
+                axes = fig.subplots(2, 2)
+                fig.suptitle('Risk Analysis Dashboard', fontsize=16, fontweight='bold')
+                
+                # 1. Risk Score
+                self._create_risk_score_chart(risk_data, axes[0, 0])
+                
+                # 2. Diversification Score
+                self._create_diversification_chart(risk_data, axes[0, 1])
+                
+                # 3. Concentration Risk
+                self._create_concentration_chart(risk_data, axes[1, 0])
+                
+                # 4. Sector Risk
+                self._create_sector_risk_chart(risk_data, axes[1, 1])
+                
+                fig.tight_layout()
+                
+                # Save chart
+                if save_path is None:
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    save_path = f"reports/risk_analysis_{timestamp}.png"
+                
+                os.makedirs(os.path.dirname(save_path), exist_ok=True)
+                fig.savefig(save_path, dpi=300, bbox_inches='tight')
+            finally:
+                self._release_fig(fig)
             
             self.logger.info(f"Risk analysis chart saved to {save_path}")
             return save_path
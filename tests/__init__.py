@@ -2,4 +2,10 @@
 Test package for ZerodhaWise.
 
 This package contains unit tests for the ZerodhaWise application.
-""" 
\ No newline at end of file
+"""
+
+import os
+import sys
+
+# The modules under src/ import each other by bare name (e.g. `from utils import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the ZerodhaWise unit tests.
+"""
+
+import logging
+import unittest
+from typing import Any, Dict
+from unittest.mock import patch
+
+
+def make_config(db_url: str = 'sqlite:///:memory:') -> Dict[str, Any]:
+    """Minimal configuration for analyzers and the DataManager under test."""
+    return {
+        'database': {
+            'url': db_url
+        },
+        'logging': {
+            'level': 'ERROR',
+            'file': ''
+        }
+    }
+
+
+class AnalyzerTestCase(unittest.TestCase):
+    """Base test case that keeps the modules under test off config/config.yaml."""
+    
+    # Modules whose setup_logging is patched for every test
+    logging_modules = ('data',)
+    
+    def setUp(self):
+        """Patch setup_logging in logging_modules and build the test configuration."""
+        for module in self.logging_modules:
+            patcher = patch(f'{module}.setup_logging', return_value=logging.getLogger(__name__))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        self.config = make_config()
@@ -0,0 +1,129 @@
+"""
+Unit tests for data module.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import text
+
+from data import DataManager
+from tests.helpers import AnalyzerTestCase, make_config
+
+
+class TestDataManager(AnalyzerTestCase):
+    """Test cases for DataManager bulk and backup APIs."""
+    
+    def setUp(self):
+        """Set up a file-backed SQLite database with the snapshot and market tables."""
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, 'portfolio.db')
+        self.config = make_config(f'sqlite:///{self.db_path}')
+        
+        self.data_manager = DataManager(self.config)
+        self.addCleanup(self.data_manager.engine.dispose)
+        with self.data_manager.engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE portfolio_snapshots (
+                    id INTEGER PRIMARY KEY, timestamp DATETIME, data BLOB,
+                    total_value FLOAT, total_pnl FLOAT, num_holdings INTEGER
+                )
+            """))
+            conn.execute(text("""
+                CREATE TABLE market_data (
+                    id INTEGER PRIMARY KEY, symbol TEXT, timestamp DATETIME, data BLOB
+                )
+            """))
+        
+        self.holdings = [
+            {'tradingsymbol': 'TCS', 'quantity': 10, 'close_price': 100, 'pnl': 50},
+            {'tradingsymbol': 'INFY', 'quantity': 5, 'market_value': 400, 'pnl': -20}
+        ]
+    
+    def _snapshot(self, days_ago: int, scale: int = 1) -> dict:
+        """Portfolio snapshot stamped days_ago days in the past."""
+        holdings = [dict(h, quantity=h['quantity'] * scale) for h in self.holdings]
+        timestamp = (datetime.now() - timedelta(days=days_ago)).replace(microsecond=0)
+        return {'holdings': holdings, 'timestamp': timestamp.isoformat()}
+    
+    def test_save_portfolios_bulk(self):
+        """Test that bulk-saved snapshots keep their own timestamps and totals."""
+        snapshots = [self._snapshot(3), self._snapshot(1, scale=2)]
+        self.assertTrue(self.data_manager.save_portfolios_bulk(snapshots))
+        
+        history = self.data_manager.get_historical_portfolio(30)
+        self.assertEqual(len(history), 2)
+        self.assertEqual(list(history.index),
+                         [pd.Timestamp(s['timestamp']) for s in snapshots])
+        self.assertEqual(history['total_value'].tolist(), [1400.0, 2400.0])
+        self.assertEqual(history['total_pnl'].tolist(), [30.0, 30.0])
+        self.assertEqual(history['num_holdings'].tolist(), [2, 2])
+        
+        # The stored payload round-trips
+        latest = self.data_manager.get_portfolio_details()
+        self.assertEqual(latest['holdings'][0]['quantity'], 20)
+    
+    def test_save_portfolios_bulk_without_timestamp(self):
+        """Test that snapshots without a timestamp are stamped with the current time."""
+        before = datetime.now()
+        self.assertTrue(self.data_manager.save_portfolios_bulk([{'holdings': self.holdings}]))
+        
+        history = self.data_manager.get_historical_portfolio(1)
+        self.assertEqual(len(history), 1)
+        self.assertGreaterEqual(history.index[0], pd.Timestamp(before))
+    
+    def test_save_portfolios_bulk_empty(self):
+        """Test that an empty batch is a successful no-op."""
+        self.assertTrue(self.data_manager.save_portfolios_bulk([]))
+        self.assertEqual(self.data_manager.get_database_stats()['portfolio_snapshots'], 0)
+    
+    def test_backup_and_restore_database(self):
+        """Test that restoring a backup discards snapshots saved after it."""
+        backup_path = os.path.join(self.tmp.name, 'backup.db')
+        self.assertTrue(self.data_manager.save_portfolios_bulk([self._snapshot(2)]))
+        
+        self.assertTrue(self.data_manager.backup_database(backup_path))
+        self.assertTrue(os.path.exists(backup_path))
+        
+        self.assertTrue(self.data_manager.save_portfolios_bulk([self._snapshot(1)]))
+        self.assertEqual(self.data_manager.get_database_stats()['portfolio_snapshots'], 2)
+        
+        self.assertTrue(self.data_manager.restore_database(backup_path))
+        self.assertEqual(self.data_manager.get_database_stats()['portfolio_snapshots'], 1)
+    
+    def test_save_market_data_bulk(self):
+        """Test that bulk-saved market data is read back per symbol."""
+        records = [
+            ('TCS', {'close': 3500.0, 'volume': 1000}),
+            ('INFY', {'close': 1500.0, 'volume': 2000}),
+            ('TCS', {'close': 3550.0, 'volume': 1200})
+        ]
+        self.assertTrue(self.data_manager.save_market_data_bulk(records))
+        self.assertTrue(self.data_manager.has_market_data())
+        
+        tcs = self.data_manager.get_market_data('TCS')
+        self.assertEqual(tcs['close'].tolist(), [3500.0, 3550.0])
+        self.assertEqual(tcs['volume'].tolist(), [1000, 1200])
+        self.assertEqual(self.data_manager.get_database_stats()['market_data_records'], 3)
+    
+    def test_iter_historical_portfolio(self):
+        """Test that windowed history matches a single query, oldest window first."""
+        snapshots = [self._snapshot(days) for days in (25, 24, 12, 2, 0)]
+        self.assertTrue(self.data_manager.save_portfolios_bulk(snapshots))
+        
+        chunks = list(self.data_manager.iter_historical_portfolio(days=30, chunk_days=7))
+        
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertFalse(chunk.empty)
+            self.assertLess(chunk.index.max() - chunk.index.min(), pd.Timedelta(days=7))
+        pd.testing.assert_frame_equal(pd.concat(chunks),
+                                      self.data_manager.get_historical_portfolio(30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Unit tests for performance module.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from performance import PerformanceAnalyzer
+from tests.helpers import AnalyzerTestCase
+
+
+class TestPerformanceAnalyzer(AnalyzerTestCase):
+    """Test cases for PerformanceAnalyzer class."""
+    
+    logging_modules = ('performance', 'data')
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        super().setUp()
+        self.analyzer = PerformanceAnalyzer(self.config)
+    
+    def _portfolio(self, values):
+        """Daily portfolio values as calculate_returns expects them."""
+        index = pd.date_range('2026-01-01', periods=len(values), freq='D')
+        return pd.DataFrame({'total_value': values}, index=index)
+    
+    def test_calculate_returns(self):
+        """Test return metrics against a pandas reference computation."""
+        values = [100.0, 110.0, 99.0, 105.0, 120.0]
+        returns = self.analyzer.calculate_returns(self._portfolio(values))
+        
+        daily = pd.Series(values).pct_change().dropna()
+        self.assertAlmostEqual(returns['total_return'], 0.2)
+        self.assertAlmostEqual(returns['avg_daily_return'], daily.mean())
+        self.assertAlmostEqual(returns['volatility'], daily.std() * np.sqrt(252))
+        self.assertAlmostEqual(returns['max_drawdown'], 99.0 / 110.0 - 1.0)
+        self.assertAlmostEqual(returns['sharpe_ratio'],
+                               (daily.mean() - 0.02 / 252) / daily.std() * np.sqrt(252))
+    
+    def test_sharpe_ratio_with_two_points(self):
+        """Test that a single daily return gives a Sharpe ratio of 0 rather than NaN."""
+        returns = self.analyzer.calculate_returns(self._portfolio([100.0, 101.0]))
+        
+        self.assertAlmostEqual(returns['total_return'], 0.01)
+        self.assertTrue(np.isnan(returns['volatility']))
+        self.assertEqual(returns['sharpe_ratio'], 0.0)
+    
+    def test_insufficient_data(self):
+        """Test that fewer than two values report an error."""
+        returns = self.analyzer.calculate_returns(self._portfolio([100.0]))
+        self.assertIn('error', returns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,9 @@
 Unit tests for portfolio module.
 """
 
+import os
+import json
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 import pandas as pd
@@ -156,7 +159,76 @@ class TestPortfolioDataValidation(unittest.TestCase):
         analysis = analyzer.analyze_portfolio(malformed_data)
         self.assertEqual(analysis['total_value'], 5000)  # 100 * 50
         self.assertEqual(analysis['number_of_holdings'], 1)
-
+    
+    def test_holdings_edited_in_place(self):
+        """Test that in-place edits to a holdings list are picked up on re-analysis."""
+        analyzer = PortfolioAnalyzer()
+        
+        portfolio = {
+            'holdings': [
+                {'tradingsymbol': 'TCS', 'sector': 'IT', 'quantity': 10, 'close_price': 100, 'pnl': 50}
+            ]
+        }
+        analysis = analyzer.analyze_portfolio(portfolio)
+        self.assertEqual(analysis['total_value'], 1000)
+        
+        # Append a holding and reprice the existing one on the same list object
+        portfolio['holdings'].append(
+            {'tradingsymbol': 'HDFCBANK', 'sector': 'Banking', 'quantity': 5, 'close_price': 200, 'pnl': -20}
+        )
+        portfolio['holdings'][0]['close_price'] = 150
+        
+        analysis = analyzer.analyze_portfolio(portfolio)
+        self.assertEqual(analysis['total_value'], 2500)  # 10 * 150 + 5 * 200
+        self.assertEqual(analysis['number_of_holdings'], 2)
+        self.assertEqual(set(analysis['sector_analysis']), {'IT', 'Banking'})
+        self.assertEqual(analysis['sector_analysis']['IT']['total_value'], 1500)
+        self.assertEqual(analysis['sector_analysis']['Banking']['count'], 1)
+        self.assertEqual([h['tradingsymbol'] for h in analysis['top_holdings']], ['TCS', 'HDFCBANK'])
+    
+    def test_missing_sectors_classified_from_ticker_info(self):
+        """Test that holdings without a sector use the NSE ticker details file."""
+        analyzer = PortfolioAnalyzer()
+        portfolio = {
+            'holdings': [
+                {'tradingsymbol': 'TCS', 'quantity': 10, 'close_price': 100, 'pnl': 50},
+                {'tradingsymbol': 'NEWCO', 'quantity': 5, 'close_price': 200, 'pnl': -20}
+            ]
+        }
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            info_path = os.path.join(tmp, 'nse_ticker_info.json')
+            with patch('src.portfolio._TICKER_INFO_PATH', info_path):
+                # No file yet: every unclassified holding is 'Unknown'
+                analysis = analyzer.analyze_portfolio(portfolio)
+                self.assertEqual(set(analysis['sector_analysis']), {'Unknown'})
+                
+                with open(info_path, 'w') as f:
+                    json.dump({'TCS': {'sector': 'Technology'}}, f)
+                analysis = analyzer.analyze_portfolio(portfolio)
+                self.assertEqual(set(analysis['sector_analysis']), {'Technology', 'Unknown'})
+                
+                # A rewritten file is read again
+                with open(info_path, 'w') as f:
+                    json.dump({'TCS': {'sector': 'Technology'}, 'NEWCO': {'sector': 'Industrials'}}, f)
+                analysis = analyzer.analyze_portfolio(portfolio)
+                self.assertEqual(set(analysis['sector_analysis']), {'Technology', 'Industrials'})
+    
+    def test_precomputed_total_value(self):
+        """Test that the precomputed dot product matches for close_price and market_value holdings."""
+        analyzer = PortfolioAnalyzer()
+        portfolio = {
+            'holdings': [
+                {'tradingsymbol': 'TCS', 'sector': 'IT', 'quantity': 10, 'close_price': 100, 'pnl': 50},
+                {'tradingsymbol': 'INFY', 'sector': 'IT', 'quantity': 5, 'market_value': 400, 'pnl': -20}
+            ]
+        }
+        
+        amounts, prices = analyzer.value_arrays(portfolio['holdings'])
+        analysis = analyzer.analyze_portfolio(portfolio, precomputed=(amounts, prices))
+        self.assertEqual(analysis['total_value'], 1400)
+        self.assertEqual(analysis['total_value'], analyzer.analyze_portfolio(portfolio)['total_value'])
+        
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
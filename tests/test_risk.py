@@ -0,0 +1,158 @@
+"""
+Unit tests for risk module.
+"""
+
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import numpy as np
+
+from risk import RiskAnalyzer, _norm_ppf
+from tests.helpers import AnalyzerTestCase
+
+
+class TestRiskAnalyzer(AnalyzerTestCase):
+    """Test cases for RiskAnalyzer class."""
+    
+    logging_modules = ('risk', 'data')
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        super().setUp()
+        self.analyzer = RiskAnalyzer(self.config)
+        self.holdings = [
+            {'tradingsymbol': 'TCS', 'sector': 'IT', 'quantity': 10, 'close_price': 300, 'pnl': 100},
+            {'tradingsymbol': 'INFY', 'sector': 'IT', 'quantity': 20, 'close_price': 100, 'pnl': -50},
+            {'tradingsymbol': 'HDFCBANK', 'sector': 'Banking', 'quantity': 5, 'close_price': 800, 'pnl': 20}
+        ]
+    
+    def test_var_without_history_is_weighted_sum(self):
+        """Test that VaR without price history assumes perfect correlation."""
+        metrics = self.analyzer.calculate_risk_metrics(self.holdings)
+        
+        weighted_var = sum(s['weight'] * s['var_95'] for s in metrics['stock_risks'])
+        self.assertAlmostEqual(metrics['portfolio_var_95'], weighted_var, places=6)
+        self.assertAlmostEqual(metrics['portfolio_var_95'], 0.25 * _norm_ppf(0.05), places=6)
+    
+    def test_holding_correlation_fills_unknown_pairs_with_ones(self):
+        """Test that holdings without history are treated as perfectly correlated."""
+        known = (('INFY', 'TCS'), np.array([[1.0, 0.2], [0.2, 1.0]]))
+        symbols = np.array(['TCS', 'INFY', 'HDFCBANK'], dtype=object)
+        
+        with patch.object(self.analyzer, '_symbol_correlation', return_value=known):
+            correlation = self.analyzer._holding_correlation(symbols)
+        
+        expected = np.array([
+            [1.0, 0.2, 1.0],
+            [0.2, 1.0, 1.0],
+            [1.0, 1.0, 1.0]
+        ])
+        np.testing.assert_allclose(correlation, expected)
+    
+    def test_var_with_partial_history(self):
+        """Test that known correlations lower VaR only for the pairs they cover."""
+        weights = np.array([0.5, 0.25, 0.25])
+        volatilities = np.full(3, 0.25)
+        quantile = _norm_ppf(0.05)
+        correlation = np.array([
+            [1.0, 0.2, 1.0],
+            [0.2, 1.0, 1.0],
+            [1.0, 1.0, 1.0]
+        ])
+        
+        var = RiskAnalyzer._portfolio_var_param(weights, volatilities, correlation, quantile)
+        perfect = RiskAnalyzer._portfolio_var_param(weights, volatilities, None, quantile)
+        
+        self.assertAlmostEqual(perfect, 0.25 * quantile)
+        self.assertLess(abs(var), abs(perfect))
+        scaled = weights * volatilities
+        self.assertAlmostEqual(var, quantile * np.sqrt(scaled @ correlation @ scaled))
+    
+    def test_var_uses_correlation(self):
+        """Test that calculate_risk_metrics applies the holdings' correlation matrix."""
+        known = (('HDFCBANK', 'INFY', 'TCS'), np.array([
+            [1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.5],
+            [0.0, 0.5, 1.0]
+        ]))
+        
+        with patch.object(self.analyzer, '_symbol_correlation', return_value=known):
+            metrics = self.analyzer.calculate_risk_metrics(self.holdings)
+        
+        # Weights are TCS 3000, INFY 2000, HDFCBANK 4000 out of 9000
+        weights = np.array([3, 2, 4]) / 9
+        correlation = np.array([
+            [1.0, 0.5, 0.0],
+            [0.5, 1.0, 0.0],
+            [0.0, 0.0, 1.0]
+        ])
+        scaled = weights * 0.25
+        expected = _norm_ppf(0.05) * np.sqrt(scaled @ correlation @ scaled)
+        self.assertAlmostEqual(metrics['portfolio_var_95'], expected, places=6)
+    
+    def test_factor_risk(self):
+        """Test the variance shares reported by _factor_risk."""
+        independent = RiskAnalyzer._factor_risk(np.eye(3))
+        np.testing.assert_allclose(independent['explained_variance_ratio'], [1 / 3] * 3)
+        
+        # Perfectly correlated returns load entirely on one factor
+        single = RiskAnalyzer._factor_risk(np.ones((3, 3)))
+        self.assertAlmostEqual(single['first_factor_share'], 1.0)
+        np.testing.assert_allclose(np.abs(single['first_factor_loadings']), [3 ** -0.5] * 3)
+        
+        self.assertEqual(RiskAnalyzer._factor_risk(np.zeros((2, 2))), {})
+    
+    def test_risk_metrics_memoized_on_contents(self):
+        """Test that results are reused for equal holdings and recomputed after edits."""
+        with patch.object(self.analyzer, '_vectors', wraps=self.analyzer._vectors) as vectors:
+            first = self.analyzer.calculate_risk_metrics(self.holdings)
+            again = self.analyzer.calculate_risk_metrics([dict(h) for h in self.holdings])
+            self.assertEqual(vectors.call_count, 1)
+            self.assertEqual(again, first)
+            
+            self.holdings[0]['close_price'] = 400
+            edited = self.analyzer.calculate_risk_metrics(self.holdings)
+            self.assertEqual(vectors.call_count, 2)
+        self.assertEqual(edited['total_portfolio_value'], 10000)
+    
+    def test_memoized_results_are_copies(self):
+        """Test that editing a returned result does not change later results."""
+        first = self.analyzer.analyze_portfolio_risk({'holdings': self.holdings})
+        first['concentration_risk']['edited'] = True
+        first['total_pnl'] = 0
+        
+        second = self.analyzer.analyze_portfolio_risk({'holdings': self.holdings})
+        self.assertNotIn('edited', second['concentration_risk'])
+        self.assertEqual(second['total_pnl'], 70)
+    
+    def test_cache_keys_do_not_keep_holdings(self):
+        """Test that memoized analyses do not hold on to the caller's list."""
+        self.analyzer.analyze_diversification(self.holdings)
+        self.assertIsNone(self.analyzer._last_key.holdings)
+    
+    def test_clear_cache(self):
+        """Test that clear_cache drops memoized analyses."""
+        with patch.object(self.analyzer, '_compute_all', wraps=self.analyzer._compute_all) as compute_all:
+            first = self.analyzer.analyze_portfolio_risk({'holdings': self.holdings})
+            self.analyzer.clear_cache()
+            second = self.analyzer.analyze_portfolio_risk({'holdings': self.holdings})
+        
+        self.assertEqual(compute_all.call_count, 2)
+        self.assertEqual(second, first)
+    
+    @patch('risk.datetime')
+    def test_market_data_caches_expire_daily(self, mock_datetime):
+        """Test that analyses reading market data are recomputed on a new day."""
+        with patch.object(self.analyzer, '_vectors', wraps=self.analyzer._vectors) as vectors:
+            mock_datetime.now.return_value = datetime(2026, 1, 5, 10)
+            self.analyzer.calculate_risk_metrics(self.holdings)
+            self.analyzer.calculate_risk_metrics(self.holdings)
+            self.assertEqual(vectors.call_count, 1)
+            
+            mock_datetime.now.return_value = datetime(2026, 1, 6, 10)
+            self.analyzer.calculate_risk_metrics(self.holdings)
+            self.assertEqual(vectors.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
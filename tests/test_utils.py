@@ -0,0 +1,96 @@
+"""
+Unit tests for utils module.
+"""
+
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from utils import disk_cache, ttl_cache
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test cases for the ttl_cache decorator."""
+    
+    def setUp(self):
+        """Set up a counting function cached for 60 seconds."""
+        self.calls = []
+        
+        @ttl_cache(60)
+        def square(x):
+            self.calls.append(x)
+            return x * x
+        
+        self.square = square
+    
+    @patch('utils.time.monotonic')
+    def test_reuses_result_within_ttl(self, mock_monotonic):
+        """Test that a result is reused per argument until it expires."""
+        mock_monotonic.return_value = 100.0
+        self.assertEqual(self.square(3), 9)
+        self.assertEqual(self.square(3), 9)
+        self.assertEqual(self.square(4), 16)
+        self.assertEqual(self.calls, [3, 4])
+        
+        mock_monotonic.return_value = 159.0
+        self.assertEqual(self.square(3), 9)
+        self.assertEqual(self.calls, [3, 4])
+        
+        # Past the TTL the function runs again
+        mock_monotonic.return_value = 161.0
+        self.assertEqual(self.square(3), 9)
+        self.assertEqual(self.calls, [3, 4, 3])
+    
+    def test_cache_clear(self):
+        """Test that cache_clear forces the next call to recompute."""
+        self.square(2)
+        self.square.cache_clear()
+        self.square(2)
+        self.assertEqual(self.calls, [2, 2])
+
+
+class TestDiskCache(unittest.TestCase):
+    """Test cases for the disk_cache decorator."""
+    
+    def setUp(self):
+        """Set up a temporary cache path."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_path = os.path.join(self.tmp.name, 'nested', 'result.pkl')
+        self.calls = 0
+    
+    def _compute(self):
+        """Counting stand-in for an expensive computation."""
+        self.calls += 1
+        return {'calls': self.calls}
+    
+    def test_persists_result(self):
+        """Test that the result is written once and loaded by later wrappers."""
+        cached = disk_cache(self.cache_path)(self._compute)
+        self.assertEqual(cached(), {'calls': 1})
+        self.assertTrue(os.path.exists(self.cache_path))
+        
+        # A fresh wrapper stands in for a new process
+        cached = disk_cache(self.cache_path)(self._compute)
+        self.assertEqual(cached(), {'calls': 1})
+        self.assertEqual(self.calls, 1)
+    
+    def test_max_age_seconds(self):
+        """Test that a cache file older than max_age_seconds is recomputed."""
+        cached = disk_cache(self.cache_path, max_age_seconds=3600)(self._compute)
+        self.assertEqual(cached(), {'calls': 1})
+        self.assertEqual(cached(), {'calls': 1})
+        
+        stale = time.time() - 7200
+        os.utime(self.cache_path, (stale, stale))
+        self.assertEqual(cached(), {'calls': 2})
+        
+        # The rewritten file is fresh again
+        self.assertEqual(cached(), {'calls': 2})
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()